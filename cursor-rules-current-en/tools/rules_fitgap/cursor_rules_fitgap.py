@@ -11,18 +11,14 @@ Outputs:
   - Generates missing .mdc files with correct category and rule_id (if --generate)
   - Updates/creates .cursor/rules/INDEX.md
 """
-import os, sys, re, json, argparse, glob, pathlib, textwrap
-from typing import Dict, List, Tuple, Optional
+import os, sys, re, json, argparse, fnmatch, functools, hashlib, pathlib, textwrap
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Iterator, List, Tuple, Optional
 
 try:
-    import yaml  # type: ignore
+    import orjson  # type: ignore
 except Exception:
-    yaml = None
-
-try:
-    import tomllib  # Python 3.11+
-except Exception:
-    tomllib = None
+    orjson = None
 
 RANGES = {
     "00-foundation": (100, 199),
@@ -61,6 +57,99 @@ DEFAULT_DETECTIONS = {
     "python": [r"\.py\b"],
 }
 
+# All detections fused into one alternation (one named group per key) so the corpus is
+# scanned once; group names must be identifiers, hence the "-" -> "_" mapping.
+_DET_GROUPS = {key.replace("-", "_"): key for key in DEFAULT_DETECTIONS}
+_ALL_DET_RE = re.compile(
+    "|".join(f"(?P<{group}>{'|'.join(DEFAULT_DETECTIONS[key])})" for group, key in _DET_GROUPS.items()),
+    re.IGNORECASE|re.MULTILINE,
+)
+_FM_RE = re.compile(r"^---\s*(.*?)\s*---", re.DOTALL|re.MULTILINE)
+_CAT_RE = re.compile(r'\bcategory:\s*"(.*?)"')
+_DESC_RE = re.compile(r'\bdescription:\s*"(.*?)"')
+_FN_RE = re.compile(r"^(\d+)-([a-z0-9\-]+)\.mdc$")
+
+# Lowercase substrings every match of a detection must contain: a cheap `in` test
+# on the lowered text rules a file out before the regex engine runs at all.
+_REQUIRED_LITERALS = {
+    "vue": ("vue",),
+    "vite": ("vite",),
+    "pinia": ("pinia",),
+    "typescript": ("typescript",),
+    "tailwind": ("tailwindcss",),
+    "fastapi": ("fastapi",),
+    "pydantic": ("pydantic",),
+    "sqlalchemy": ("sqlalchemy",),
+    "alembic": ("alembic",),
+    "sqlite": ("sqlite://", ".db"),
+    "pytest": ("pytest",),
+    "pre-commit": ("pre-commit",),
+    "ruff": ("ruff",),
+    "black": ("black",),
+    "mypy": ("mypy",),
+    "openapi": ("openapi", "swagger"),
+    "json": (".json",),
+    "jest": ("jest",),
+    "vitest": ("vitest",),
+    "python": (".py",),
+}
+
+# Files above _LARGE_FILE bytes are scanned in _CHUNK_SIZE windows; the overlap must exceed
+# the longest detection match so nothing is lost at a window boundary.
+_LARGE_FILE = 1 << 20
+_CHUNK_SIZE = 65536
+_CHUNK_OVERLAP = 32
+
+# Directories never worth descending into when looking for file-type hints.
+_SKIP_DIRS = {".git", "node_modules", ".venv"}
+_EXT_HINTS = {".vue": "vue", ".py": "python", ".db": "sqlite"}
+
+def _list_dir(path: str) -> Tuple[List[str], List[str]]:
+    """Return (files, subdirs) of one directory, pruning hidden and skipped dirs."""
+    files, subdirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                # glob's "**" never matched dot-entries either
+                if entry.name.startswith(".") or entry.name in _SKIP_DIRS:
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                (subdirs if is_dir else files).append(entry.path)
+    except OSError:
+        pass
+    return files, subdirs
+
+def _parallel_walk(root: str, max_workers: int = 8):
+    """Yield every file path below root.
+
+    scandir releases the GIL, so wide trees are listed on a thread pool; narrow
+    ones (<= 4 top-level subdirs) are walked inline where the pool isn't worth it.
+    Stopping iteration early cancels directories not yet listed.
+    """
+    files, pending = _list_dir(root)
+    yield from files
+    if len(pending) <= 4:
+        while pending:
+            files, subdirs = _list_dir(pending.pop())
+            pending.extend(subdirs)
+            yield from files
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futures = {ex.submit(_list_dir, d) for d in pending}
+        try:
+            while futures:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    files, subdirs = fut.result()
+                    futures.update(ex.submit(_list_dir, d) for d in subdirs)
+                    yield from files
+        finally:
+            for fut in futures:
+                fut.cancel()
+
 def read_text(path: str) -> str:
     try:
         with open(path, "r", encoding="utf-8", errors="ignore") as f:
@@ -68,13 +157,129 @@ def read_text(path: str) -> str:
     except Exception:
         return ""
 
-def load_mapping(repo_root: str) -> Dict:
+def _read_frontmatter(path: str, limit: int = 4096) -> Optional[re.Match]:
+    """Find the frontmatter block, reading only the head of the file when it suffices.
+
+    A match inside the first `limit` bytes is also the first match in the
+    whole file, so the rest is only read when the head holds no closed block.
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(limit)
+            fm = _FM_RE.search(head.decode("utf-8", errors="ignore"))
+            if fm or len(head) < limit:
+                return fm
+            return _FM_RE.search((head + f.read()).decode("utf-8", errors="ignore"))
+    except Exception:
+        return None
+
+def _scan_text(text: str, detections: Dict[str, bool], remaining: set, pos: int = 0, partial: bool = False) -> None:
+    """Mark every detection key matched in text[pos:], removing it from remaining.
+
+    With partial=True the text is a window of a larger file: a match touching its
+    end may be truncated or see a false word boundary, so it is left to the next window.
+    """
+    lowered = text.lower()
+    if not any(lit in lowered for key in remaining for lit in _REQUIRED_LITERALS[key]):
+        return
+    for m in _ALL_DET_RE.finditer(text, pos):
+        if partial and m.end() == len(text):
+            continue
+        key = _DET_GROUPS[m.lastgroup]
+        if key in remaining:
+            detections[key] = True
+            remaining.discard(key)
+            if not remaining:
+                return
+
+def _scan_file(path: str, detections: Dict[str, bool], remaining: set) -> None:
+    """Scan one file; large files (lockfiles) are read in overlapping chunks.
+
+    Bytes are decoded as latin-1, which is free and lossless for the ASCII-only
+    detection patterns, and the size comes from fstat on the already open file.
+    """
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size <= _LARGE_FILE:
+                _scan_text(f.read().decode("latin-1"), detections, remaining)
+                return
+            carry = ""
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                window = carry + chunk.decode("latin-1")
+                # pos=1 keeps carry[0] as look-behind context for \b; it was fully scanned last round
+                _scan_text(window, detections, remaining, pos=1 if carry else 0, partial=True)
+                if not remaining:
+                    return
+                carry = window[-_CHUNK_OVERLAP:]
+            _scan_text(carry, detections, remaining, pos=1)
+    except OSError:
+        pass
+
+# Results of a previous run, keyed by (mtime_ns, size) of their inputs, so repeat runs on
+# an unchanged tree skip the scans. The cache lives in a per-user cache directory, one
+# file per repository, so runs never touch the committed .cursor/rules tree. JSON rather
+# than pickle: cached data must not be able to execute code when loaded.
+_CACHE_VERSION = 1
+
+def default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "rules_fitgap")
+
+def _cache_path(repo_root: str, cache_dir: str) -> str:
+    repo_hash = hashlib.sha1(os.path.abspath(repo_root).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{repo_hash}.json")
+
+def load_cache(repo_root: str, cache_dir: str) -> Dict:
+    try:
+        with open(_cache_path(repo_root, cache_dir), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = None
+    if not isinstance(data, dict) or data.get("version") != _CACHE_VERSION:
+        return {"version": _CACHE_VERSION}
+    return data
+
+def save_cache(repo_root: str, cache_dir: str, cache: Dict, loaded: Optional[Dict] = None) -> None:
+    """Write the cache, unless it still equals loaded (the data load_cache returned)."""
+    if loaded is not None and cache == loaded:
+        return
+    path = _cache_path(repo_root, cache_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except (OSError, TypeError, ValueError):
+        pass
+
+def _stat_sig(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+@functools.lru_cache(maxsize=1)
+def _load_mapping_cached(mapping_path: str, mtime_ns: int) -> Dict:
+    # mtime_ns is only part of the cache key, so an edited mapping is re-read.
+    # yaml is imported here so runs served from the scan cache never load it.
+    import yaml  # type: ignore
+    # Prefer the libyaml-backed loader when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(mapping_path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=loader) or {}
+
+def load_mapping(repo_root: str, cache: Optional[Dict] = None) -> Dict:
     mapping_path = os.path.join(repo_root, "tools", "rules_fitgap", "mapping.yaml")
-    if os.path.exists(mapping_path) and yaml:
+    sig = _stat_sig(mapping_path) if cache is not None else None
+    if sig and cache.get("mapping", {}).get("sig") == sig:
+        return cache["mapping"]["data"]
+    if os.path.exists(mapping_path):
         try:
-            with open(mapping_path, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f) or {}
-                return data
+            data = _load_mapping_cached(mapping_path, os.stat(mapping_path).st_mtime_ns)
+            # Only cache what survives a JSON round-trip unchanged (no int keys, dates, ...)
+            if sig and json.loads(json.dumps(data, default=str)) == data:
+                cache["mapping"] = {"sig": sig, "data": data}
+            return data
         except Exception:
             pass
     # Fallback: embed a minimal default mapping compatible with the doc
@@ -102,8 +307,12 @@ def load_mapping(repo_root: str) -> Dict:
         }
     }
 
-def detect_stack(repo_root: str) -> Dict[str, bool]:
-    """Heuristic scan of common files to detect technologies."""
+def detect_stack(repo_root: str, cache: Optional[Dict] = None) -> Dict[str, bool]:
+    """Heuristic scan of common files to detect technologies.
+
+    With a cache (see load_cache), the keyword scan is reused when none of the
+    scanned files changed; the filesystem hints are always re-checked.
+    """
     detections: Dict[str, bool] = {k: False for k in DEFAULT_DETECTIONS.keys()}
     interesting_files = [
         "package.json", "pnpm-lock.yaml", "yarn.lock",
@@ -113,46 +322,63 @@ def detect_stack(repo_root: str) -> Dict[str, bool]:
         "swagger.yaml", "swagger.yml", "swagger.json",
     ]
 
-    # Gather contents
-    corpus = ""
-    for f in interesting_files:
-        p = os.path.join(repo_root, f)
-        if os.path.exists(p):
-            corpus += "\n" + read_text(p)
-
+    # One listing of the repo root answers every existence check below
+    try:
+        with os.scandir(repo_root) as it:
+            root_entries = {e.name: e for e in it}
+    except OSError:
+        root_entries = {}
+    candidate_names = [f for f in interesting_files if f in root_entries]
     # Also scan top-level Dockerfiles and compose
     for pat in ["Dockerfile", "Dockerfile.*", "docker-compose*.yml", "docker-compose*.yaml"]:
-        for p in glob.glob(os.path.join(repo_root, pat)):
-            corpus += "\n" + read_text(p)
+        candidate_names.extend(sorted(n for n in fnmatch.filter(root_entries, pat) if not n.startswith(".")))
 
-    # Keyword scan
-    for key, patterns in DEFAULT_DETECTIONS.items():
-        for pat in patterns:
-            if re.search(pat, corpus, re.IGNORECASE|re.MULTILINE):
+    present = []
+    for name in candidate_names:
+        entry = root_entries[name]
+        try:
+            if not entry.is_file():
+                continue
+            st = entry.stat()
+        except OSError:
+            continue
+        present.append((entry.path, [st.st_mtime_ns, st.st_size]))
+    scan_key = cached_hits = None
+    if cache is not None:
+        scan_key = hashlib.sha1(json.dumps([_ALL_DET_RE.pattern, [(os.path.relpath(p, repo_root), sig) for p, sig in present]]).encode("utf-8")).hexdigest()
+        cached = cache.get("detect") or {}
+        if cached.get("key") == scan_key:
+            cached_hits = cached["hits"]
+
+    if cached_hits is not None:
+        for key in cached_hits:
+            detections[key] = True
+    else:
+        # Keyword scan, file by file; stop reading once every key has been seen
+        remaining = set(DEFAULT_DETECTIONS)
+        for p, _ in present:
+            _scan_file(p, detections, remaining)
+            if not remaining:
+                break
+        if scan_key:
+            cache["detect"] = {"key": scan_key, "hits": sorted(k for k, v in detections.items() if v)}
+
+    # Quick filesystem hints (Vue components, Python presence, SQLite files, JS tests),
+    # gathered in one tree walk that stops as soon as nothing is left to find
+    pending = {k for k in ("vue", "python", "sqlite", "vitest") if not detections[k]}
+    if pending:
+        for path in _parallel_walk(repo_root):
+            name = os.path.basename(path)
+            key = _EXT_HINTS.get(os.path.splitext(name)[1])
+            if key in pending:
                 detections[key] = True
+                pending.discard(key)
+            if "vitest" in pending and (".spec." in name or ".test." in name):
+                detections["vitest"] = True
+                pending.discard("vitest")
+            if not pending:
                 break
 
-    # Quick filesystem hints
-    # Vue components
-    if not detections["vue"]:
-        vue_files = glob.glob(os.path.join(repo_root, "**", "*.vue"), recursive=True)
-        if vue_files:
-            detections["vue"] = True
-    # Python presence
-    if not detections["python"]:
-        py_files = glob.glob(os.path.join(repo_root, "**", "*.py"), recursive=True)
-        if py_files:
-            detections["python"] = True
-    # SQLite hint by files
-    for db_file in glob.glob(os.path.join(repo_root, "**", "*.db"), recursive=True):
-        detections["sqlite"] = True
-        break
-
-    # JS testing
-    if not detections["vitest"]:
-        if glob.glob(os.path.join(repo_root, "**", "*.spec.*"), recursive=True) or glob.glob(os.path.join(repo_root, "**", "*.test.*"), recursive=True):
-            detections["vitest"] = True
-
     # Collapse related keys to simpler booleans
     summary = {
         "vue": detections["vue"],
@@ -176,56 +402,126 @@ def detect_stack(repo_root: str) -> Dict[str, bool]:
     }
     return summary
 
-def read_existing_rules(repo_root: str) -> Dict[str, Dict]:
+_SLUG_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789-")
+
+def _split_rule_filename(fn: str) -> Tuple[Optional[int], Optional[str]]:
+    """Split "<id>-<slug>.mdc" with plain string ops; same result as _FN_RE."""
+    if fn.endswith(".mdc"):
+        head, sep, slug = fn[:-4].partition("-")
+        if sep and slug and head.isdecimal() and _SLUG_CHARS.issuperset(slug):
+            return int(head), slug
+    m = _FN_RE.match(fn)
+    if m:
+        return int(m.group(1)), m.group(2)
+    return None, None
+
+def _parse_rule(path: str, repo_root: str) -> Dict:
+    return _rule_info(path, repo_root, _read_frontmatter(path))
+
+def _rule_info(path: str, repo_root: str, fm: Optional[re.Match]) -> Dict:
+    fn = os.path.basename(path)
+    rule_id, slug = _split_rule_filename(fn)
+    # Take category/description from the frontmatter, if any
+    category = None
+    description = ""
+    if fm:
+        block = fm.group(1)
+        cm = _CAT_RE.search(block)
+        if cm:
+            category = cm.group(1).strip()
+        dm = _DESC_RE.search(block)
+        if dm:
+            description = dm.group(1).strip()
+    key = path.replace(repo_root+os.sep, "")
+    return {
+        "path": key,
+        "filename": fn,
+        "rule_id": rule_id,
+        "slug": slug,
+        "category": category,
+        "description": description,
+    }
+
+def read_existing_rules(repo_root: str, cache: Optional[Dict] = None) -> Dict[str, Dict]:
     rules_root = os.path.join(repo_root, ".cursor", "rules")
     results = {}
     if not os.path.isdir(rules_root):
         return results
-    for path in glob.glob(os.path.join(rules_root, "**", "*.mdc"), recursive=True):
-        fn = os.path.basename(path)
-        m = re.match(r"^(\d+)-([a-z0-9\-]+)\.mdc$", fn)
-        rule_id = None
-        slug = None
-        if m:
-            rule_id = int(m.group(1))
-            slug = m.group(2)
-        # Try parse frontmatter for category/description
-        text = read_text(path)
-        category = None
-        description = ""
-        fm = re.search(r"^---\s*(.*?)\s*---", text, re.DOTALL|re.MULTILINE)
-        if fm:
-            block = fm.group(1)
-            cm = re.search(r'\bcategory:\s*"(.*?)"', block)
-            if cm:
-                category = cm.group(1).strip()
-            dm = re.search(r'\bdescription:\s*"(.*?)"', block)
-            if dm:
-                description = dm.group(1).strip()
-        key = path.replace(repo_root+os.sep, "")
-        results[key] = {
-            "path": key,
-            "filename": fn,
-            "rule_id": rule_id,
-            "slug": slug,
-            "category": category,
-            "description": description,
-        }
+    cached_rules = cache.get("rules", {}) if cache is not None else {}
+    paths = sorted(p for p in _parallel_walk(rules_root) if p.endswith(".mdc"))
+    sigs = [_stat_sig(p) if cache is not None else None for p in paths]
+    infos: List[Optional[Dict]] = []
+    for path, sig in zip(paths, sigs):
+        hit = cached_rules.get(os.path.relpath(path, repo_root))
+        infos.append(hit["info"] if sig and hit and hit["sig"] == sig else None)
+
+    # Parse the remaining files concurrently; the work is dominated by file reads
+    misses = [i for i, info in enumerate(infos) if info is None]
+    if len(misses) > 4:
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 2)) as ex:
+            for i, info in zip(misses, ex.map(lambda i: _parse_rule(paths[i], repo_root), misses)):
+                infos[i] = info
+    else:
+        for i in misses:
+            infos[i] = _parse_rule(paths[i], repo_root)
+
+    fresh_rules = {}
+    for info, sig in zip(infos, sigs):
+        if sig:
+            fresh_rules[info["path"]] = {"sig": sig, "info": info}
+        results[info["path"]] = info
+    if cache is not None:
+        cache["rules"] = fresh_rules
     return results
 
-def next_free_id(existing_ids: List[int], cat_slug: str) -> int:
-    r = RANGES.get(cat_slug, (9000, 9999))
-    used = set([i for i in existing_ids if r[0] <= i <= r[1]])
-    for i in range(r[0], r[1]+1):
-        if i not in used:
+def free_id_allocator(existing_ids: List[int]):
+    """Return an allocate(cat_slug) function that hands out each free rule_id once.
+
+    Each range is walked by a single lazy iterator, so allocating N rules costs
+    one pass over the range instead of N.
+    """
+    used = set(existing_ids)
+    iters: Dict[Tuple[int, int], Iterator[int]] = {}
+
+    def allocate(cat_slug: str) -> int:
+        r = RANGES.get(cat_slug, (9000, 9999))
+        it = iters.get(r)
+        if it is None:
+            it = iters[r] = (i for i in range(r[0], r[1]+1) if i not in used)
+        for i in it:
             return i
-    raise RuntimeError(f"No free rule_id left in range {r} for category {cat_slug}")
+        raise RuntimeError(f"No free rule_id left in range {r} for category {cat_slug}")
+
+    return allocate
 
 def ensure_category_folder(repo_root: str, cat_slug: str) -> str:
     path = os.path.join(repo_root, ".cursor", "rules", cat_slug)
     os.makedirs(path, exist_ok=True)
     return path
 
+# Rule body template, dedented once at import rather than per generated rule
+_RULE_BODY = textwrap.dedent("""
+    # {title}
+
+    ## Ziel
+    {description}
+
+    ## Anforderungen
+    - Klare, umsetzbare Punkte formulieren (keine Vagheiten)
+    - Relevante Beispiele hinzufügen (Good/Bad)
+    - Trigger über `globs` verifizieren
+
+    ## Good
+    ```txt
+    # Beispiel für gutes Muster
+    ```
+
+    ## Bad
+    ```txt
+    # Beispiel für antipattern
+    ```
+    """).strip()
+
 def make_rule_content(rule_id: int, cat_slug: str, slug: str, description: str, tags: List[str], globs: List[str], always=False) -> str:
     front = {
         "description": description,
@@ -250,125 +546,120 @@ def make_rule_content(rule_id: int, cat_slug: str, slug: str, description: str,
         else:
             lines.append(f'{k}: "{v}"')
     lines.append("---")
-    body = textwrap.dedent(f"""
-    # {slug.replace('-', ' ').title()}
-
-    ## Ziel
-    {description}
-
-    ## Anforderungen
-    - Klare, umsetzbare Punkte formulieren (keine Vagheiten)
-    - Relevante Beispiele hinzufügen (Good/Bad)
-    - Trigger über `globs` verifizieren
-
-    ## Good
-    ```txt
-    # Beispiel für gutes Muster
-    ```
-
-    ## Bad
-    ```txt
-    # Beispiel für antipattern
-    ```
-    """).strip()
-    return "\n".join(lines) + "\n" + body + "\n"
+    title = slug.replace('-', ' ').title()
+    return "".join(["\n".join(lines), "\n", _RULE_BODY.format(title=title, description=description), "\n"])
 
 def plan_required_rules(detections: Dict[str, bool], mapping: Dict) -> List[Dict]:
-    required = []
+    # Keyed by (category, slug): detections sharing a rule list it once, first one wins
+    required: Dict[Tuple[str, str], Dict] = {}
     det_map = mapping.get("detections", {})
     for key, active in detections.items():
         if not active:
             continue
         if key in det_map:
             for spec in det_map[key]:
-                required.append(spec.copy())
+                spec_key = (spec["category"], spec["slug"])
+                if spec_key not in required:
+                    required[spec_key] = spec.copy()
     # Foundation base rules are always desirable
-    required.append({
+    for spec in ({
         "category":"00-foundation",
         "slug":"base-standards",
         "description":"Projektweite Basisstandards (Ordner, Benennung, Security-Basics)",
         "tags":["foundation","standards"],
         "globs":[]
-    })
-    required.append({
+    }, {
         "category":"00-foundation",
         "slug":"fit-gap-rules",
         "description":"Fit–Gap Governance und Automatisierung",
         "tags":["governance","coverage"],
         "globs":[]
-    })
-    return required
+    }):
+        required.setdefault((spec["category"], spec["slug"]), spec)
+    return list(required.values())
+
+def dump_plan(plan: Dict, compact: bool = False) -> bytes:
+    """Serialize the plan, with orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(plan, option=0 if compact else orjson.OPT_INDENT_2)
+    if compact:
+        return json.dumps(plan, separators=(",", ":")).encode("utf-8")
+    return json.dumps(plan, indent=2).encode("utf-8")
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--repo", default=".", help="Repository root")
     ap.add_argument("--plan", default="fitgap-plan.json", help="Output plan json path")
     ap.add_argument("--generate", action="store_true", help="Generate missing rules")
+    ap.add_argument("--compact", action="store_true", help="Write the plan json without indentation")
+    ap.add_argument("--cache-dir", default=default_cache_dir(),
+                    help="Directory for the scan cache (default: $XDG_CACHE_HOME/rules_fitgap)")
     args = ap.parse_args()
 
     repo_root = os.path.abspath(args.repo)
-    mapping = load_mapping(repo_root)
-    detections = detect_stack(repo_root)
-    existing = read_existing_rules(repo_root)
+    cache = load_cache(repo_root, args.cache_dir)
+    # Deep copy via JSON, to tell afterwards whether anything in the cache changed
+    loaded = json.loads(json.dumps(cache))
+    mapping = load_mapping(repo_root, cache)
+    detections = detect_stack(repo_root, cache)
+    existing = read_existing_rules(repo_root, cache)
 
     required = plan_required_rules(detections, mapping)
 
     # Build index for existing ids
     existing_ids = []
-    existing_by_slug_cat = {}
+    existing_by_cat_slug = {}
     for info in existing.values():
         if info["rule_id"] is not None:
             existing_ids.append(info["rule_id"])
-        key = f'{info.get("category")}/{info.get("slug")}' if info.get("category") and info.get("slug") else info["filename"]
-        existing_by_slug_cat[key] = info
+        existing_by_cat_slug.setdefault((info.get("category"), info.get("slug")), info)
 
+    allocate_id = free_id_allocator(existing_ids)
+    created = {}
     plan = {"detections": detections, "required_rules": [], "existing": existing, "actions": []}
 
     for spec in required:
         cat = spec["category"]
         slug = spec["slug"]
-        key = f"{cat}/{slug}"
-        # Check if any existing file in this category matches slug by filename pattern
-        found = None
-        for info in existing.values():
-            if info.get("category") == cat and info.get("slug") == slug:
-                found = info
-                break
-            # fallback: filename contains slug
-            if slug in info["filename"] and (cat in info.get("path","")):
-                found = info
-                break
+        found = existing_by_cat_slug.get((cat, slug))
+        if found is None:
+            # fallback: a file under this category whose filename contains slug
+            found = next((info for info in existing.values()
+                          if slug in info["filename"] and cat in info.get("path", "")), None)
 
         status = "present" if found else "missing"
         plan["required_rules"].append({"category":cat,"slug":slug,"description":spec["description"],"status":status})
 
         if status == "missing" and args.generate:
-            rid = next_free_id(existing_ids, cat)
-            existing_ids.append(rid)
+            rid = allocate_id(cat)
             folder = ensure_category_folder(repo_root, cat)
             filename = f"{rid}-{slug}.mdc"
             path = os.path.join(folder, filename)
             content = make_rule_content(rid, cat, slug, spec["description"], spec.get("tags",[]), spec.get("globs",[]), always=False)
             os.makedirs(folder, exist_ok=True)
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(content)
-            plan["actions"].append({"action":"create","path":path.replace(repo_root+os.sep,""),"rule_id":rid})
+            pathlib.Path(path).write_bytes(content.encode("utf-8"))
+            info = _rule_info(path, repo_root, _FM_RE.search(content))
+            created[info["path"]] = info
+            sig = _stat_sig(path)
+            if sig:
+                cache.setdefault("rules", {})[info["path"]] = {"sig": sig, "info": info}
+            plan["actions"].append({"action":"create","path":info["path"],"rule_id":rid})
 
     # Write plan
-    with open(os.path.join(repo_root, args.plan), "w", encoding="utf-8") as f:
-        json.dump(plan, f, indent=2)
+    pathlib.Path(repo_root, args.plan).write_bytes(dump_plan(plan, args.compact))
 
     # Update INDEX.md
     index_path = os.path.join(repo_root, ".cursor", "rules", "INDEX.md")
     os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    # The index covers the rules read up front plus those generated above,
+    # parsed from the content we just wrote rather than re-read from disk
+    indexed = {**existing, **created}
     rows = []
-    # refresh existing after generation
-    existing = read_existing_rules(repo_root)
-    for info in sorted(existing.values(), key=lambda x: (x["category"] or "", x["rule_id"] or 0, x["filename"])):
+    for info in sorted(indexed.values(), key=lambda x: (x["category"] or "", x["rule_id"] or 0, x["filename"])):
         rows.append(f'| {info.get("rule_id","")} | {info.get("category","")} | {info.get("slug","")} | `{info.get("path","")}` | {info.get("description","")} |')
     index_md = "# Cursor Rules Index\n\n| ID | Category | Slug | Path | Description |\n|---:|---|---|---|---|\n" + "\n".join(rows) + "\n"
-    with open(index_path, "w", encoding="utf-8") as f:
-        f.write(index_md)
+    pathlib.Path(index_path).write_bytes(index_md.encode("utf-8"))
+    save_cache(repo_root, args.cache_dir, cache, loaded)
 
     print(f"Detections: {json.dumps(detections, indent=2)}")
     print(f"Wrote plan to: {os.path.join(repo_root, args.plan)}")
@@ -4,8 +4,16 @@ MDC Generator for Cursor IDE
 A tool for automatically generating .mdc documentation files for codebases.
 """
 
-from .repo_analyzer import analyze_repository
-
 __all__ = ["analyze_repository"]
 
 __version__ = "0.1.0"
+
+
+def __getattr__(name):
+    # Resolve analyze_repository on first access (PEP 562) so that importing the
+    # package, e.g. for `mdcgen --help`, does not pull in the analysis stack.
+    if name == "analyze_repository":
+        from .repo_analyzer import analyze_repository
+
+        return analyze_repository
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,10 +4,9 @@ Command-line interface for cursor-mdc-generator.
 
 import click
 import os
-import asyncio
 import logging
-from .repo_analyzer import analyze_repository
 from .llm_utils.auth import get_key_manager
+from .cli_options import log_level_option, run_async
 from .logging_utils import setup_colored_logging
 
 
@@ -35,14 +34,7 @@ from .logging_utils import setup_colored_logging
     default="gpt-4o-mini",
     help="OpenAI model to use for generating summaries.",
 )
-@click.option(
-    "--log-level",
-    default="INFO",
-    type=click.Choice(
-        ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], case_sensitive=False
-    ),
-    help="Set the logging level.",
-)
+@log_level_option
 @click.option(
     "--imports",
     "-i",
@@ -81,8 +73,25 @@ from .logging_utils import setup_colored_logging
     is_flag=True,
     help="Only update MDC files with poor quality (implies --check-quality).",
 )
+@click.option(
+    "--concurrency",
+    default=20,
+    type=click.IntRange(min=1),
+    help="Maximum number of concurrent LLM requests.",
+)
+@click.option(
+    "--batch-api",
+    is_flag=True,
+    help="Use the OpenAI Batch API for file and directory MDCs (half the cost, results may take hours).",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Always call the LLM instead of reusing responses to identical prompts from earlier runs.",
+)
 def cli(
-    path, repo, out, token, model, log_level, imports, no_viz, no_dirs, no_repo, depth, check_quality, update_poor_quality
+    path, repo, out, token, model, log_level, imports, no_viz, no_dirs, no_repo, depth, check_quality, update_poor_quality,
+    concurrency, batch_api, no_cache,
 ):
     """Generate MDC files for Cursor IDE from repository analysis.
     
@@ -114,9 +123,19 @@ def cli(
     if update_poor_quality:
         check_quality = True
 
+    # Imported here so that --help and argument errors stay fast
+    from .repo_analyzer import analyze_repository
+    from .llm_utils.llm_client import close_http_client
+
+    async def run_analysis(**kwargs):
+        try:
+            return await analyze_repository(**kwargs)
+        finally:
+            await close_http_client()
+
     # Run the analysis
-    result = asyncio.run(
-        analyze_repository(
+    result = run_async(
+        run_analysis(
             repo_url=repo,
             local_path=local_path,
             output_dir=out,
@@ -129,6 +148,9 @@ def cli(
             max_directory_depth=depth,
             check_quality=check_quality,
             update_poor_quality=update_poor_quality,
+            max_concurrency=concurrency,
+            use_batch_api=batch_api,
+            use_response_cache=not no_cache,
         )
     )
     if result:
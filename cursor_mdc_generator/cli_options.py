@@ -0,0 +1,36 @@
+"""
+Click options and helpers shared by the mdcgen command-line interfaces.
+"""
+
+import sys
+
+import click
+
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+log_level_option = click.option(
+    "--log-level",
+    default="INFO",
+    type=click.Choice(LOG_LEVELS, case_sensitive=False),
+    help="Set the logging level.",
+)
+
+
+def run_async(coro):
+    """Run a coroutine to completion, on uvloop when it is installed.
+
+    uvloop is optional (``pip install mdcgen[speedups]``) and not available
+    on Windows; without it this is plain ``asyncio.run``.
+    """
+    import asyncio
+
+    if sys.platform != "win32":
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            if hasattr(uvloop, "run"):
+                return uvloop.run(coro)
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(coro)
@@ -7,26 +7,45 @@ Does not interfere with the existing file-based CLI.
 
 import os
 import sys
+import hashlib
 import json
-import asyncio
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from types import MappingProxyType
+from typing import Optional, List, Dict, Any, Mapping
 
 import click
 
 from .rule_planner import ThematicRulePlanner, load_mapping_config, ProjectDetector
 from .rule_id_allocator import RuleIDAllocator
-from .llm_utils.llm_client import generate_mdc_response
-from .llm_utils.prompts import format_thematic_rule_prompt, format_project_summary_prompt, SYSTEM_PROMPT
+from .llm_utils.prompts import (
+    format_thematic_rule_prefix,
+    format_thematic_rule_spec,
+    format_project_summary_prompt,
+    SYSTEM_PROMPT,
+)
+from .cli_options import log_level_option, run_async
 from .logging_utils import setup_colored_logging, log_section, log_file_status
 
 
 logger = logging.getLogger(__name__)
 
+# Rule file parsing for INDEX.md
+_FM_RE = re.compile(r"^---\s*(.*?)\s*---", re.DOTALL | re.MULTILINE)
+# category and description in one pass over the frontmatter block
+_FIELDS_RE = re.compile(r'category:\s*"(?P<cat>.*?)"|description:\s*"(?P<desc>.*?)"')
+_FILENAME_RE = re.compile(r"^(\d+)-([a-z0-9\-]+)\.mdc$")
+_SOURCE_HASH_RE = re.compile(r"^source_hash:\s*([0-9a-f]+)\s*$", re.MULTILINE)
+# Frontmatter is expected near the top of a rule file; reading stops here
+_FRONTMATTER_MAX_CHARS = 64 * 1024
+
 
+@lru_cache(maxsize=1)
 def load_authoring_spec() -> str:
-    """Load the rule authoring specification."""
+    """Load the rule authoring specification (read once per process)."""
     spec_path = Path(__file__).parent / "rule_authoring_spec.md"
     try:
         with open(spec_path, "r", encoding="utf-8") as f:
@@ -36,133 +55,174 @@ def load_authoring_spec() -> str:
         return "# Rule Authoring Specification\n(Specification file not found)"
 
 
-def load_default_mapping() -> Dict:
-    """Load default mapping configuration."""
+@lru_cache(maxsize=1)
+def load_default_mapping() -> Mapping[str, Any]:
+    """
+    Load default mapping configuration (read once per process).
+
+    The result is shared between callers and therefore read-only.
+    """
     mapping_path = Path(__file__).parent / "data" / "mapping.yaml"
     if mapping_path.exists():
-        return load_mapping_config(str(mapping_path))
-    return {}
+        return MappingProxyType(load_mapping_config(str(mapping_path)))
+    return MappingProxyType({})
+
+
+def clear_config_cache() -> None:
+    """Forget the cached authoring spec and default mapping."""
+    load_authoring_spec.cache_clear()
+    load_default_mapping.cache_clear()
 
 
 async def generate_rule_content(
     rule_spec: Dict[str, Any],
-    project_context: str,
-    authoring_spec: str,
+    prompt_prefix: str,
     model: str,
-) -> Optional[str]:
+) -> Any:
     """
     Generate MDC rule content using LLM.
 
     Args:
         rule_spec: Rule specification
-        project_context: Project context summary
-        authoring_spec: Authoring specification content
+        prompt_prefix: Prompt prefix from format_thematic_rule_prefix; pass
+            the same string for every rule of a run so providers can cache it
         model: LLM model to use
 
+    Transient provider errors are retried inside the LLM client. Any other
+    error, or a transient one that outlasts the retries, propagates to the
+    caller, which gathers and logs it.
+
     Returns:
-        Generated MDC content or None on error
+        MDCResponse from the LLM (see build_mdc_from_response)
     """
-    try:
-        user_prompt = format_thematic_rule_prompt(
-            rule_spec=rule_spec,
-            project_context=project_context,
-            authoring_spec=authoring_spec,
-        )
-
-        response = await generate_mdc_response(
-            system_prompt=SYSTEM_PROMPT,
-            user_prompt=user_prompt,
-            model_name=model,
-            temperature=0.3,
-        )
-
-        # The response is an MDCResponse object with various fields
-        # Build the MDC file from it
-        mdc_content = build_mdc_from_response(response, rule_spec)
-        return mdc_content
-
-    except Exception as e:
-        logger.error(f"Error generating rule {rule_spec.get('slug')}: {e}")
-        return None
+    # litellm is slow to import; load it only once a rule is actually generated
+    from .llm_utils.llm_client import generate_mdc_response
+
+    # The file itself is built once the rule ID is known
+    return await generate_mdc_response(
+        system_prompt=SYSTEM_PROMPT,
+        user_prompt=format_thematic_rule_spec(rule_spec),
+        model_name=model,
+        temperature=0.3,
+        cached_prefix=prompt_prefix,
+    )
+
+
+_FRONTMATTER_TMPL = (
+    "---\n"
+    'description: "{description}"\n'
+    "globs: {globs_json}\n"
+    "alwaysApply: {always_apply}\n"
+    'category: "{category}"\n'
+    "rule_id: {rule_id}\n"
+    "tags: {tags_json}\n"
+    "{source_hash_line}"
+    "---\n"
+)
 
 
-def build_mdc_from_response(response: Any, rule_spec: Dict[str, Any]) -> str:
+def build_mdc_from_response(
+    response: Any,
+    rule_spec: Dict[str, Any],
+    rule_id: int = 0,
+    source_hash: Optional[str] = None,
+) -> str:
     """
     Build complete MDC file from LLM response.
 
     Args:
         response: MDCResponse from LLM
         rule_spec: Original rule specification
+        rule_id: Assigned rule ID (0 when IDs are not assigned)
+        source_hash: Fingerprint of the generation inputs (see rule_fingerprint)
 
     Returns:
         Complete MDC file content with frontmatter
     """
-    # Build frontmatter
-    frontmatter = ["---"]
-    
-    # Use description from response or fallback to spec
-    description = response.description if hasattr(response, 'description') else rule_spec.get('description', '')
-    frontmatter.append(f'description: "{description}"')
-    
-    # Globs
-    globs = rule_spec.get('globs', [])
-    if globs:
-        globs_json = json.dumps(globs)
-        frontmatter.append(f'globs: {globs_json}')
-    else:
-        frontmatter.append('globs: []')
-    
-    # alwaysApply based on activation type
-    activation = rule_spec.get('activation', 'auto')
-    always_apply = activation == 'always'
-    frontmatter.append(f'alwaysApply: {"true" if always_apply else "false"}')
-    
-    # Category
-    category = rule_spec.get('category', '99-other')
-    frontmatter.append(f'category: "{category}"')
-    
-    # rule_id (to be filled later)
-    frontmatter.append('rule_id: 0  # Will be assigned')
-    
-    # Tags
-    tags = rule_spec.get('tags', [])
-    tags_json = json.dumps(tags)
-    frontmatter.append(f'tags: {tags_json}')
-    
-    frontmatter.append("---")
-    
-    # Build body from response
-    body_parts = []
-    
-    # Add overview if available
-    if hasattr(response, 'overview') and response.overview:
-        body_parts.append(f"# {rule_spec.get('slug', 'Rule').replace('-', ' ').title()}\n")
-        body_parts.append(response.overview)
-    
-    # Add key points
-    if hasattr(response, 'key_points') and response.key_points:
-        body_parts.append("\n## Key Points\n")
-        for point in response.key_points:
-            body_parts.append(f"- {point}")
-    
-    # Add examples
-    if hasattr(response, 'examples') and response.examples:
-        body_parts.append("\n## Examples\n")
-        body_parts.append(response.examples)
-    
-    # Add best practices
-    if hasattr(response, 'best_practices') and response.best_practices:
-        body_parts.append("\n## Best Practices\n")
-        for practice in response.best_practices:
-            body_parts.append(f"- {practice}")
+    # Read every optional response field once
+    description = getattr(response, 'description', None)
+    if description is None:
+        description = rule_spec.get('description', '')
+    overview = getattr(response, 'overview', None)
+    key_points = getattr(response, 'key_points', None)
+    examples = getattr(response, 'examples', None)
+    best_practices = getattr(response, 'best_practices', None)
+    
+    # Frontmatter; alwaysApply is based on the activation type. json.dumps with
+    # default arguments already runs on the C encoder, and its ", " separator
+    # is the list format existing rule files use, so there is no orjson here.
+    parts = [
+        _FRONTMATTER_TMPL.format(
+            description=description,
+            globs_json=json.dumps(rule_spec.get('globs') or []),
+            always_apply="true" if rule_spec.get('activation', 'auto') == 'always' else "false",
+            category=rule_spec.get('category', '99-other'),
+            rule_id=rule_id,
+            tags_json=json.dumps(rule_spec.get('tags', [])),
+            source_hash_line=f"source_hash: {source_hash}\n" if source_hash else "",
+        )
+    ]
+    body_start = len(parts)
+    
+    # Body from the structured response fields
+    if overview:
+        parts.append(f"# {rule_spec.get('slug', 'Rule').replace('-', ' ').title()}\n")
+        parts.append(overview)
+    if key_points:
+        parts.append("\n## Key Points\n")
+        parts.extend(f"- {point}" for point in key_points)
+    if examples:
+        parts.append("\n## Examples\n")
+        parts.append(examples)
+    if best_practices:
+        parts.append("\n## Best Practices\n")
+        parts.extend(f"- {practice}" for practice in best_practices)
     
     # If response doesn't have structured fields, use raw content
-    if not body_parts and hasattr(response, 'content'):
-        body_parts.append(response.content)
+    if len(parts) == body_start and hasattr(response, 'content'):
+        parts.append(response.content)
     
-    # Combine everything
-    full_content = "\n".join(frontmatter) + "\n\n" + "\n".join(body_parts) + "\n"
-    return full_content
+    parts.append("")
+    return "\n".join(parts)
+
+
+def rule_fingerprint(rule_spec: Dict[str, Any], model: str, prompt_prefix: str) -> str:
+    """
+    Hash every input that shapes a generated rule.
+
+    Covers the system prompt, the shared prompt prefix (project context and
+    authoring spec), the per-rule prompt and the model.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (SYSTEM_PROMPT, prompt_prefix, format_thematic_rule_spec(rule_spec), model):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def find_up_to_date_rule(
+    rules_dir: Path, category: str, slug: str, fingerprint: str
+) -> Optional[Path]:
+    """Return an existing rule file for category/slug generated from the same inputs."""
+    category_dir = rules_dir / category
+    try:
+        names = os.listdir(category_dir)
+    except OSError:
+        return None
+    for name in names:
+        match = _FILENAME_RE.match(name)
+        if not match or match.group(2) != slug:
+            continue
+        try:
+            fm_match = _read_frontmatter(category_dir / name)
+        except (OSError, UnicodeDecodeError):
+            # Unreadable rule files are simply regenerated
+            continue
+        if fm_match:
+            hash_match = _SOURCE_HASH_RE.search(fm_match.group(1))
+            if hash_match and hash_match.group(1) == fingerprint:
+                return category_dir / name
+    return None
 
 
 def write_rule_file(
@@ -171,6 +231,7 @@ def write_rule_file(
     slug: str,
     rule_id: int,
     content: str,
+    create_dir: bool = True,
 ) -> Path:
     """
     Write rule file to appropriate location.
@@ -181,23 +242,22 @@ def write_rule_file(
         slug: Rule slug
         rule_id: Assigned rule ID
         content: MDC content
+        create_dir: Create the category directory first; callers that
+            created it already can skip the extra syscalls
 
     Returns:
         Path to written file
     """
-    # Create category directory
     category_dir = rules_dir / category
-    category_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Update rule_id in content
-    content = content.replace("rule_id: 0  # Will be assigned", f"rule_id: {rule_id}")
+    if create_dir:
+        category_dir.mkdir(parents=True, exist_ok=True)
     
-    # Write file
+    # Write file: one encode, one unbuffered write
     filename = f"{rule_id}-{slug}.mdc"
     file_path = category_dir / filename
     
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(content)
+    with open(file_path, "wb", buffering=0) as f:
+        f.write(content.encode("utf-8"))
     
     log_file_status(str(file_path.name), "created", f"Category: {category}")
     return file_path
@@ -210,6 +270,9 @@ async def generate_thematic_rules(
     spec_path: Optional[str],
     model: str,
     assign_ids: bool,
+    concurrency: int = 8,
+    rebuild_index: bool = False,
+    force: bool = False,
 ) -> None:
     """
     Main function to generate thematic rules.
@@ -221,7 +284,14 @@ async def generate_thematic_rules(
         spec_path: Optional custom authoring spec
         model: LLM model to use
         assign_ids: Whether to assign rule IDs
+        concurrency: Maximum number of LLM requests in flight
+        rebuild_index: Rebuild INDEX.md from all rule files instead of
+            merging the new rules into it
+        force: Regenerate rules even when an existing file was generated
+            from identical inputs
     """
+    import asyncio
+
     # Load configuration
     if mapping_path:
         mapping = load_mapping_config(mapping_path)
@@ -264,24 +334,59 @@ async def generate_thematic_rules(
         custom_ranges=mapping.get("id_ranges")
     ) if assign_ids else None
     
-    # Generate rules
-    generated_files = []
-    
+    # Render the run-wide prompt prefix once; every rule shares these exact
+    # bytes, which is what lets providers cache it
+    prompt_prefix = format_thematic_rule_prefix(project_context, authoring_spec)
+
+    # Skip rules whose file on disk was generated from exactly the same inputs
+    jobs = []
     for rule_spec in planned_rules:
+        fingerprint = rule_fingerprint(rule_spec, model, prompt_prefix)
+        existing = None if force else find_up_to_date_rule(
+            rules_dir,
+            rule_spec.get('category', '99-other'),
+            rule_spec.get('slug', 'unknown'),
+            fingerprint,
+        )
+        if existing is not None:
+            click.echo(f"  ↷ Up to date: {existing.relative_to(rules_dir.parent.parent)}")
+        else:
+            jobs.append((rule_spec, fingerprint))
+
+    # Generate rule content concurrently; the semaphore keeps us under provider rate limits
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def generate_limited(rule_spec: Dict[str, Any]) -> Any:
+        async with semaphore:
+            click.echo(
+                f"Generating rule: {rule_spec.get('category', '99-other')}/"
+                f"{rule_spec.get('slug', 'unknown')}..."
+            )
+            return await generate_rule_content(
+                rule_spec=rule_spec,
+                prompt_prefix=prompt_prefix,
+                model=model,
+            )
+
+    results = await asyncio.gather(
+        *(generate_limited(rule_spec) for rule_spec, _ in jobs),
+        return_exceptions=True,
+    )
+
+    # Allocate IDs in plan order on this thread (the allocator is not thread-safe),
+    # so allocation stays deterministic
+    pending_writes = []
+    created_dirs = set()
+    
+    for (rule_spec, fingerprint), response in zip(jobs, results):
         category = rule_spec.get('category', '99-other')
         slug = rule_spec.get('slug', 'unknown')
         
-        click.echo(f"Generating rule: {category}/{slug}...")
+        if isinstance(response, BaseException):
+            logger.error(f"Error generating rule {slug}: {response}")
+            response = None
         
-        # Generate content
-        content = await generate_rule_content(
-            rule_spec=rule_spec,
-            project_context=project_context,
-            authoring_spec=authoring_spec,
-            model=model,
-        )
-        
-        if not content:
+        if not response:
             click.echo(f"  ⚠️  Failed to generate {slug}", err=True)
             continue
         
@@ -296,20 +401,50 @@ async def generate_thematic_rules(
             # Use placeholder ID
             rule_id = 0
         
-        # Write file
-        file_path = write_rule_file(
+        # Create each category directory only once
+        if category not in created_dirs:
+            (rules_dir / category).mkdir(parents=True, exist_ok=True)
+            created_dirs.add(category)
+        content = build_mdc_from_response(response, rule_spec, rule_id, source_hash=fingerprint)
+        pending_writes.append((category, slug, rule_id, content))
+    
+    # Write the files in worker threads instead of blocking the event loop;
+    # a failed write is reported below without aborting the others
+    file_paths = await asyncio.gather(*(
+        asyncio.to_thread(
+            write_rule_file,
             rules_dir=rules_dir,
             category=category,
             slug=slug,
             rule_id=rule_id,
             content=content,
+            create_dir=False,
         )
+        for category, slug, rule_id, content in pending_writes
+    ), return_exceptions=True)
+    
+    generated_files = []
+    index_entries = []
+    # Every rule is written below rules_dir, so paths are reported by slicing off this prefix
+    rel_prefix = os.path.join(str(rules_dir.parent.parent), "")
+    
+    for (category, slug, rule_id, content), file_path in zip(pending_writes, file_paths):
+        if isinstance(file_path, BaseException):
+            logger.error(f"Error writing rule {slug}: {file_path}")
+            click.echo(f"  ⚠️  Failed to write {slug}", err=True)
+            continue
+        
+        info = _rule_info(file_path, rules_dir, _FM_RE.search(content))
+        if info is not None:
+            index_entries.append(info)
         
-        generated_files.append(str(file_path.relative_to(rules_dir.parent.parent)))
-        click.echo(f"  ✓ Generated: {file_path.relative_to(rules_dir.parent.parent)}")
+        rel_path = str(file_path)[len(rel_prefix):]
+        generated_files.append(rel_path)
+        click.echo(f"  ✓ Generated: {rel_path}")
     
-    # Generate INDEX.md
-    update_index(rules_dir)
+    # Generate INDEX.md, merging this run's rules into the existing index,
+    # in a worker thread like the rule writes
+    await asyncio.to_thread(update_index, rules_dir, new_entries=index_entries, rebuild=rebuild_index)
     
     # Summary
     click.echo(f"\n✓ Generated {len(generated_files)} rules in {rules_dir}")
@@ -318,73 +453,185 @@ async def generate_thematic_rules(
         click.echo("\n⚠️  Note: Rule IDs not assigned (use without --no-assign-ids to assign)")
 
 
-def update_index(rules_dir: Path) -> None:
-    """Update INDEX.md with all rules."""
-    from .rule_id_allocator import RuleIDAllocator
-    import glob as glob_module
-    import re
-    
-    index_path = rules_dir / "INDEX.md"
-    
-    # Scan all rules
-    rows = []
-    pattern = str(rules_dir / "**" / "*.mdc")
-    
+def _read_frontmatter(path: Path, chunk_size: int = 4096) -> Optional["re.Match"]:
+    """
+    Find the frontmatter block, reading the file only as far as needed.
+
+    Reads chunk by chunk until the block is closed (a match in a prefix of
+    the file is also the first match in the whole file), the file ends or
+    _FRONTMATTER_MAX_CHARS have been read. The block can only close once a
+    chunk brings in a new "---", so the search is skipped for other chunks.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        chunks = []
+        size = 0
+        while size < _FRONTMATTER_MAX_CHARS:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            # Include the previous chunk's last two characters, in case a
+            # "---" straddles the boundary
+            tail = chunks[-1][-2:] if chunks else ""
+            chunks.append(chunk)
+            size += len(chunk)
+            if "---" in tail + chunk:
+                fm_match = _FM_RE.search("".join(chunks))
+                if fm_match:
+                    return fm_match
+        return None
+
+
+def _read_rule_info(file_path: Path, rules_dir: Path) -> Optional[Dict[str, Any]]:
+    """Collect the INDEX.md fields for one rule file, or None if it is not a rule."""
+    if not _FILENAME_RE.match(file_path.name):
+        return None
+
+    try:
+        fm_match = _read_frontmatter(file_path)
+    except Exception as e:
+        logger.warning(f"Could not read rule {file_path}: {e}")
+        return None
+
+    return _rule_info(file_path, rules_dir, fm_match)
+
+
+def _rule_info(file_path: Path, rules_dir: Path, fm_match: Optional["re.Match"]) -> Optional[Dict[str, Any]]:
+    """Build the INDEX.md fields from a rule's path and frontmatter match."""
+    # Extract from filename
+    match = _FILENAME_RE.match(file_path.name)
+    if not match:
+        return None
+
+    category = ""
+    description = ""
+    if fm_match:
+        seen_cat = seen_desc = False
+        for field in _FIELDS_RE.finditer(fm_match.group(1)):
+            # The first occurrence of each field wins
+            if field.group("cat") is not None and not seen_cat:
+                category, seen_cat = field.group("cat"), True
+            elif field.group("desc") is not None and not seen_desc:
+                description, seen_desc = field.group("desc"), True
+            if seen_cat and seen_desc:
+                break
+
+    return {
+        "rule_id": int(match.group(1)),
+        "category": category,
+        "slug": match.group(2),
+        "path": str(file_path.relative_to(rules_dir.parent)),
+        "description": description,
+    }
+
+
+_INDEX_HEADER = (
+    "# Cursor Rules Index\n\n"
+    "| ID | Category | Slug | Path | Description |\n"
+    "|---:|---|---|---|---|\n"
+)
+
+
+def _read_index_rows(index_path: Path) -> Optional[List[Dict[str, Any]]]:
+    """
+    Parse the rows of an INDEX.md written by update_index.
+
+    Returns None when the file is missing or not in the expected format, in
+    which case the caller rebuilds the index from the rule files.
+    """
+    try:
+        text = index_path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    if not text.startswith(_INDEX_HEADER):
+        return None
+
     rules_info = []
-    for path in glob_module.glob(pattern, recursive=True):
-        file_path = Path(path)
-        filename = file_path.name
-        
-        # Extract from filename
-        match = re.match(r"^(\d+)-([a-z0-9\-]+)\.mdc$", filename)
-        if not match:
-            continue
-        
-        rule_id = int(match.group(1))
-        slug = match.group(2)
-        
-        # Read frontmatter
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                content = f.read()
-            
-            category = ""
-            description = ""
-            
-            fm_match = re.search(r"^---\s*(.*?)\s*---", content, re.DOTALL | re.MULTILINE)
-            if fm_match:
-                block = fm_match.group(1)
-                cat_match = re.search(r'category:\s*"(.*?)"', block)
-                if cat_match:
-                    category = cat_match.group(1)
-                desc_match = re.search(r'description:\s*"(.*?)"', block)
-                if desc_match:
-                    description = desc_match.group(1)
-            
-            rel_path = file_path.relative_to(rules_dir.parent)
-            rules_info.append({
-                "rule_id": rule_id,
-                "category": category,
-                "slug": slug,
-                "path": str(rel_path),
-                "description": description,
-            })
-        except Exception as e:
-            logger.warning(f"Could not read rule {path}: {e}")
+    for line in text[len(_INDEX_HEADER):].splitlines():
+        if not line:
             continue
+        if not (line.startswith("| ") and line.endswith(" |")):
+            return None
+        # The description is last, so any "|" it contains stays in that cell
+        cells = line[2:-2].split(" | ", 4)
+        if len(cells) != 5 or not cells[0].isdigit():
+            return None
+        rule_id, category, slug, path, description = cells
+        rules_info.append({
+            "rule_id": int(rule_id),
+            "category": category,
+            "slug": slug,
+            "path": path.strip("`"),
+            "description": description,
+        })
+    return rules_info
+
+
+def _scan_rules(rules_dir: Path) -> List[Dict[str, Any]]:
+    """Read the INDEX.md fields of every rule file under rules_dir."""
+    # Reads are independent, so large rule sets use a thread pool
+    paths = list(rules_dir.rglob("*.mdc"))
+    if len(paths) > 16:
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 2)) as executor:
+            scanned = list(executor.map(lambda p: _read_rule_info(p, rules_dir), paths))
+    else:
+        scanned = [_read_rule_info(p, rules_dir) for p in paths]
+    return [info for info in scanned if info is not None]
+
+
+def update_index(
+    rules_dir: Path,
+    new_entries: Optional[List[Dict[str, Any]]] = None,
+    rebuild: bool = False,
+) -> None:
+    """
+    Update INDEX.md with all rules.
+
+    Args:
+        rules_dir: Base .cursor/rules directory
+        new_entries: Rules written in this run. When given, they are merged
+            into the existing INDEX.md instead of rescanning every rule file.
+        rebuild: Always rebuild the index from the rule files
+    """
+    index_path = rules_dir / "INDEX.md"
+    
+    rules_info = None
+    if new_entries is not None and not rebuild:
+        rules_info = _read_index_rows(index_path)
+        if rules_info is not None:
+            # Rows for rule files that were deleted or renamed since the index
+            # was written are dropped; new entries replace rows for the same file
+            base_dir = rules_dir.parent
+            by_path = {
+                info["path"]: info for info in rules_info
+                if (base_dir / info["path"]).is_file()
+            }
+            by_path.update((info["path"], info) for info in new_entries)
+            rules_info = list(by_path.values())
+    if rules_info is None:
+        rules_info = _scan_rules(rules_dir)
+    
+    update_index_from_entries(rules_dir, rules_info)
+
+
+def update_index_from_entries(rules_dir: Path, entries: List[Dict[str, Any]]) -> None:
+    """
+    Write INDEX.md from already collected rule entries, without reading rules.
+
+    Args:
+        rules_dir: Base .cursor/rules directory
+        entries: One dict per rule with rule_id, category, slug, path and description
+    """
+    index_path = rules_dir / "INDEX.md"
     
     # Sort by category, then rule_id
-    rules_info.sort(key=lambda x: (x["category"], x["rule_id"]))
+    entries = sorted(entries, key=lambda x: (x["category"], x["rule_id"]))
     
     # Build table
-    for info in rules_info:
-        row = f"| {info['rule_id']} | {info['category']} | {info['slug']} | `{info['path']}` | {info['description']} |"
-        rows.append(row)
-    
-    index_content = "# Cursor Rules Index\n\n"
-    index_content += "| ID | Category | Slug | Path | Description |\n"
-    index_content += "|---:|---|---|---|---|\n"
-    index_content += "\n".join(rows) + "\n"
+    rows = [
+        f"| {info['rule_id']} | {info['category']} | {info['slug']} | `{info['path']}` | {info['description']} |"
+        for info in entries
+    ]
+    index_content = _INDEX_HEADER + "\n".join(rows) + "\n"
     
     with open(index_path, "w", encoding="utf-8") as f:
         f.write(index_content)
@@ -422,14 +669,23 @@ def update_index(rules_dir: Path) -> None:
     help="Skip automatic rule ID assignment",
 )
 @click.option(
-    "--log-level",
-    default="INFO",
-    type=click.Choice(
-        ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], case_sensitive=False
-    ),
-    help="Set the logging level",
+    "--concurrency",
+    default=8,
+    type=click.IntRange(min=1),
+    help="Maximum number of concurrent LLM requests",
 )
-def cli(repo, output_dir, mapping, spec, model, no_assign_ids, log_level):
+@click.option(
+    "--rebuild-index",
+    is_flag=True,
+    help="Rebuild INDEX.md from all rule files instead of updating it",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Regenerate rules even if they are up to date with their inputs",
+)
+@log_level_option
+def cli(repo, output_dir, mapping, spec, model, no_assign_ids, concurrency, rebuild_index, force, log_level):
     """
     Generate thematic Cursor MDC rules based on project detection.
 
@@ -463,16 +719,29 @@ def cli(repo, output_dir, mapping, spec, model, no_assign_ids, log_level):
         )
         sys.exit(1)
 
+    async def run_generation(**kwargs):
+        try:
+            await generate_thematic_rules(**kwargs)
+        finally:
+            # The LLM client (and litellm with it) is only imported once a rule
+            # is generated; a run where everything is up to date never loads it
+            llm_client = sys.modules.get(__package__ + ".llm_utils.llm_client")
+            if llm_client is not None:
+                await llm_client.close_http_client()
+
     # Run generation
     try:
-        asyncio.run(
-            generate_thematic_rules(
+        run_async(
+            run_generation(
                 repo_root=os.path.abspath(repo),
                 output_dir=os.path.abspath(output_dir),
                 mapping_path=mapping,
                 spec_path=spec,
                 model=model,
                 assign_ids=not no_assign_ids,
+                concurrency=concurrency,
+                rebuild_index=rebuild_index,
+                force=force,
             )
         )
     except KeyboardInterrupt:
@@ -0,0 +1,235 @@
+"""
+Splitting of source files into the snippets that file MDC prompts are built from.
+
+Kept free of the LLM stack (litellm, tiktoken) so that the worker processes
+split_files starts, which import this module afresh under the spawn start
+method, come up quickly.
+"""
+
+import ast
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+
+class SplitCache:
+    """
+    On-disk cache of split_content results for Python files.
+
+    Entries are keyed by a SHA-256 of the file content (plus the Python
+    version, which decides what parses, and FORMAT_VERSION), so an edited
+    file simply misses; nothing has to be invalidated.
+    """
+
+    # Bump when split_content changes what it returns for the same source
+    FORMAT_VERSION = 3
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS ast_cache (key TEXT PRIMARY KEY, splits TEXT NOT NULL)"
+        )
+
+    def _key(self, content):
+        digest = hashlib.sha256(content.encode("utf-8", "surrogatepass")).hexdigest()
+        return "{}:{}.{}:{}".format(self.FORMAT_VERSION, sys.version_info[0], sys.version_info[1], digest)
+
+    def get(self, content):
+        row = self.conn.execute(
+            "SELECT splits FROM ast_cache WHERE key=?", (self._key(content),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, content, splits):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO ast_cache (key, splits) VALUES (?, ?)",
+            (self._key(content), json.dumps(splits)),
+        )
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Python files with fewer lines than this are sent whole, without splitting
+SMALL_FILE_LINES = 40
+
+# Below this many Python files to parse, starting worker processes costs more
+# than parsing them in this one
+PARALLEL_SPLIT_MIN_FILES = 64
+
+
+def _source_lines(lines, first, last):
+    """Join source lines first..last (1-based, inclusive)."""
+    return "\n".join(lines[first - 1:last]).rstrip()
+
+
+def split_content(content, file_path, cache=None):
+    """
+    Split Python file content into functions, classes, and free-standing code.
+
+    If cache (a SplitCache) is given, Python files are only parsed when their
+    content has not been split before.
+    """
+    # Handle Python files
+    if file_path.endswith(".py"):
+        # Small modules read just as well whole; skip parsing them
+        if content.count("\n") < SMALL_FILE_LINES:
+            return [{"name": "whole_file", "type": "file", "content": content}]
+        if cache is not None:
+            splits = cache.get(content)
+            if splits is None:
+                splits = split_content(content, file_path)
+                cache.put(content, splits)
+            return splits
+        try:
+            # Only top-level line ranges are needed, so the C parser in the
+            # stdlib ast module is enough; astroid's inference is not used here
+            module = ast.parse(content, filename=file_path)
+            # Slice the original source by line numbers instead of rendering
+            # nodes back to source; this also keeps comments and formatting
+            lines = content.split("\n")
+            splits = []
+            # (first line, last line) of the pending free-standing statements
+            current_block = None
+
+            body = module.body
+            if (
+                body
+                and isinstance(body[0], ast.Expr)
+                and isinstance(body[0].value, ast.Constant)
+                and isinstance(body[0].value.value, str)
+            ):
+                # The module docstring is not part of any component
+                body = body[1:]
+
+            for node in body:
+                start = node.lineno
+                if getattr(node, "decorator_list", None):
+                    # lineno is the def/class line; include the decorators
+                    start = min(start, node.decorator_list[0].lineno)
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    if current_block:
+                        splits.append(
+                            {
+                                "name": "free_standing_code",
+                                "type": "code",
+                                "content": _source_lines(lines, *current_block),
+                            }
+                        )
+                        current_block = None
+                    splits.append(
+                        {
+                            "name": node.name,
+                            "type": type(node).__name__,
+                            "content": _source_lines(lines, start, node.end_lineno),
+                        }
+                    )
+                elif current_block:
+                    current_block = (current_block[0], node.end_lineno)
+                else:
+                    current_block = (start, node.end_lineno)
+
+            if current_block:
+                splits.append(
+                    {
+                        "name": "free_standing_code",
+                        "type": "code",
+                        "content": _source_lines(lines, *current_block),
+                    }
+                )
+            return (
+                splits
+                if splits
+                else [{"name": "whole_file", "type": "file", "content": content}]
+            )
+        except Exception:
+            # If parsing fails, return the whole content
+            return [{"name": "whole_file", "type": "file", "content": content}]
+    # Handle JavaScript and TypeScript files
+    elif file_path.endswith((".js", ".jsx", ".ts", ".tsx")):
+        return [{"name": "whole_file", "type": "file", "content": content}]
+    else:
+        # For all other file types, just include them as whole files
+        return [{"name": "whole_file", "type": "file", "content": content}]
+
+
+async def split_files(contents, cache=None):
+    """
+    Run split_content over many files.
+
+    Args:
+        contents: Dictionary of file path to file content
+        cache: Optional SplitCache, consulted and filled in this process
+
+    Returns:
+        Dictionary of file path to splits, in the order of contents. Files
+        whose split failed are logged and left out.
+
+    Python files that actually need parsing (large enough and not cached) are
+    parsed once per distinct content, so vendored or generated copies cost a
+    single parse, and in a process pool when there are at least
+    PARALLEL_SPLIT_MIN_FILES of them.
+    """
+    file_data = {}
+    to_parse = []
+    # content -> paths sharing it, for the files in to_parse
+    copies = {}
+    for file_path, content in contents.items():
+        if file_path.endswith(".py") and content.count("\n") >= SMALL_FILE_LINES:
+            splits = cache.get(content) if cache is not None else None
+            if splits is None:
+                file_data[file_path] = None  # Placeholder that keeps the order
+                if content in copies:
+                    copies[content].append(file_path)
+                else:
+                    copies[content] = [file_path]
+                    to_parse.append(file_path)
+                continue
+        else:
+            splits = split_content(content, file_path)
+        file_data[file_path] = splits
+
+    if len(to_parse) >= PARALLEL_SPLIT_MIN_FILES:
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor() as pool:
+            results = await asyncio.gather(
+                *(
+                    loop.run_in_executor(pool, split_content, contents[file_path], file_path)
+                    for file_path in to_parse
+                ),
+                return_exceptions=True,
+            )
+    else:
+        results = []
+        for file_path in to_parse:
+            try:
+                results.append(split_content(contents[file_path], file_path))
+            except Exception as e:
+                results.append(e)
+
+    for file_path, splits in zip(to_parse, results):
+        content = contents[file_path]
+        for copy_path in copies[content]:
+            if isinstance(splits, Exception):
+                logging.error("Error processing file: %s. Error: %s", copy_path, splits)
+                del file_data[copy_path]
+            else:
+                file_data[copy_path] = splits
+        if cache is not None and not isinstance(splits, Exception):
+            cache.put(content, splits)
+    return file_data
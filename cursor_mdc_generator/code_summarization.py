@@ -1,17 +1,24 @@
-import astroid
-from astroid import nodes
+import asyncio
+import functools
+import hashlib
+import heapq
+import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 import networkx as nx
 
 # Import from our new modules
-from .llm_utils.llm_client import generate_mdc_response, batch_generate_mdc_responses
+# SplitCache, split_content and split_files are also importable from here
+from .code_splitting import SMALL_FILE_LINES, SplitCache, split_content, split_files
+from .llm_utils.llm_client import bounded, generate_mdc_response, batch_generate_mdc_responses
 from .llm_utils.prompts import (
     format_file_prompt,
     format_directory_prompt,
     format_repository_prompt,
     SYSTEM_PROMPT,
 )
+from .llm_utils.models import MDCResponse
 from .llm_utils.tokenize_utils import get_tokenizer, tokenize
 from .mdc_quality_analyzer import (
     scan_existing_mdc_files,
@@ -32,62 +39,85 @@ def read_file_content(file_path):
             with open(file_path, "r", encoding="latin-1") as f:
                 return f.read()
         except Exception:
-            logging.error("Error reading file {}: {}".format(file_path, e))
+            logging.error("Error reading file %s: %s", file_path, e)
             return None
 
 
-def split_content(content, file_path):
-    """Split Python file content into functions, classes, and free-standing code."""
-    # Handle Python files
-    if file_path.endswith(".py"):
-        try:
-            module = astroid.parse(content)
-            splits = []
-            current_block = []
-
-            for node in module.body:
-                if isinstance(node, (nodes.FunctionDef, nodes.ClassDef)):
-                    if current_block:
-                        splits.append(
-                            {
-                                "name": "free_standing_code",
-                                "type": "code",
-                                "content": "\n".join(current_block),
-                            }
-                        )
-                        current_block = []
-                    splits.append(
-                        {
-                            "name": node.name,
-                            "type": type(node).__name__,
-                            "content": node.as_string(),
-                        }
-                    )
-                else:
-                    current_block.append(node.as_string())
-
-            if current_block:
-                splits.append(
-                    {
-                        "name": "free_standing_code",
-                        "type": "code",
-                        "content": "\n".join(current_block),
-                    }
-                )
-            return (
-                splits
-                if splits
-                else [{"name": "whole_file", "type": "file", "content": content}]
-            )
-        except Exception:
-            # If parsing fails, return the whole content
-            return [{"name": "whole_file", "type": "file", "content": content}]
-    # Handle JavaScript and TypeScript files
-    elif file_path.endswith((".js", ".jsx", ".ts", ".tsx")):
-        return [{"name": "whole_file", "type": "file", "content": content}]
-    else:
-        # For all other file types, just include them as whole files
-        return [{"name": "whole_file", "type": "file", "content": content}]
+class GraphContext:
+    """Dependency graph lookups computed once per run and shared by the MDC generators."""
+
+    def __init__(self, dependency_graph, file_paths):
+        self.graph = dependency_graph
+        # node -> (files importing it, files it imports)
+        self.neighbors = {
+            n: (list(dependency_graph.predecessors(n)), list(dependency_graph.successors(n)))
+            for n in dependency_graph.nodes()
+        }
+        # file -> its directory; os.path.dirname runs once per path
+        self.dir_of = {f: os.path.dirname(f) for f in file_paths}
+        # directory -> files directly in it, in file_paths order
+        self.dir_files = {}
+        for f, d in self.dir_of.items():
+            self.dir_files.setdefault(d, []).append(f)
+        # directory -> (files elsewhere imported by its files, files elsewhere
+        # importing its files), from one pass over the edges
+        self.dir_dependencies = {}
+        node_dir = {
+            n: self.dir_of[n] if n in self.dir_of else os.path.dirname(n)
+            for n in self.neighbors
+        }
+        for source, target in dependency_graph.edges():
+            source_dir = node_dir[source]
+            target_dir = node_dir[target]
+            if source_dir == target_dir:
+                continue
+            if source in self.dir_of:
+                self._dir_dependency_sets(source_dir)[0].add(target)
+            if target in self.dir_of:
+                self._dir_dependency_sets(target_dir)[1].add(source)
+
+    def _dir_dependency_sets(self, directory):
+        return self.dir_dependencies.setdefault(directory, (set(), set()))
+
+    def imported_by(self, file_path):
+        return self.neighbors.get(file_path, ([], []))[0]
+
+    def imports(self, file_path):
+        return self.neighbors.get(file_path, ([], []))[1]
+
+
+def _within_tokens(texts, limit):
+    """
+    Cheap check that texts cannot exceed limit tokens, without tokenizing.
+
+    Every token is at least one UTF-8 byte and a character at most four, so
+    n characters are never more than 4 * n tokens. False means "count them".
+    """
+    return sum(len(text) for text in texts) * 4 <= limit
+
+
+def _token_count(text):
+    """gpt-4o token count of text."""
+    return len(tokenize(text, get_tokenizer("gpt-4o")))
+
+
+@functools.lru_cache(maxsize=1)
+def _system_prompt_tokens():
+    """Token count of SYSTEM_PROMPT, which every MDC prompt includes."""
+    return _token_count(SYSTEM_PROMPT)
+
+
+# Largest prompt the large-context models take in one request
+LARGE_CONTEXT_TOKENS = 1000000
+
+
+def _model_for_tokens(messages_tokens, model_name):
+    """Model whose context window fits messages_tokens; model_name below 128K."""
+    if messages_tokens > 200000:  # 200K-1M tokens
+        return "gemini-2.0-flash"
+    if messages_tokens > 128000:  # 128K-200K tokens
+        return "claude-3-5-sonnet-latest"
+    return model_name
 
 
 async def prepare_directory_mdc(
@@ -96,82 +126,59 @@ async def prepare_directory_mdc(
     dependency_graph,
     output_dir,
     model_name="gpt-4o-mini",
+    graph_context=None,
 ):
     """
     Prepare an MDC file for a directory, including dependency information.
 
     Args:
         directory: Directory path to document
-        file_snippets_dict: Dictionary of code snippets for files in this directory
+        file_snippets_dict: Dictionary of code snippets for all files; only
+            used to build a GraphContext when none is given
         dependency_graph: NetworkX DiGraph with dependency information
         output_dir: Directory to write the MDC file
         model_name: OpenAI model to use
+        graph_context: Precomputed GraphContext; built from the graph if omitted.
+            The directory's files come from its dir_files index, so callers
+            preparing many directories should pass one shared instance
 
     Returns:
         Tuple of (directory, dir_mdc_path, user_prompt, selected_model, needs_large_context)
     """
+    if graph_context is None:
+        graph_context = GraphContext(dependency_graph, file_snippets_dict.keys())
+
     try:
         # Create directory-specific MDC path with flattened structure
         # Replace slashes with underscores to create a unique filename
         dir_filename = directory.replace("/", "_").replace("\\", "_")
         dir_mdc_path = os.path.join(output_dir, f"{dir_filename}_directory.mdc")
-        os.makedirs(os.path.dirname(dir_mdc_path), exist_ok=True)
 
         # Find files in this directory
-        dir_files = [
-            f for f in file_snippets_dict.keys() if os.path.dirname(f) == directory
-        ]
-
-        # Get dependency information for the directory as a whole
-        dir_imports = set()
-        imported_by_dir = set()
-
-        for file_path in dir_files:
-            if file_path in dependency_graph.nodes():
-                # Files outside this directory that are imported by files in this directory
-                dir_imports.update(
-                    [
-                        succ
-                        for succ in dependency_graph.successors(file_path)
-                        if os.path.dirname(succ) != directory
-                    ]
-                )
+        dir_files = graph_context.dir_files.get(directory, [])
 
-                # Files outside this directory that import files in this directory
-                imported_by_dir.update(
-                    [
-                        pred
-                        for pred in dependency_graph.predecessors(file_path)
-                        if os.path.dirname(pred) != directory
-                    ]
-                )
+        # Files outside this directory that files in it import, and files
+        # outside it that import them
+        dir_imports, imported_by_dir = graph_context.dir_dependencies.get(
+            directory, (set(), set())
+        )
 
         # Build the prompt with directory content and dependencies
         user_prompt = format_directory_prompt(
             directory, dir_files, dir_imports, imported_by_dir
         )
 
-        # Calculate token count for context window management
-        tokenizer = get_tokenizer("gpt-4o")
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ]
-        messages_tokens = 0
-        for message in messages:
-            messages_tokens += len(tokenize(message["content"], tokenizer))
-
-        # Determine the appropriate model based on token count
-        needs_large_context = False
-        if messages_tokens > 1000000:  # >1M tokens
-            needs_large_context = True
-            selected_model = "gemini-2.0-flash"
-        elif messages_tokens > 200000:  # 200K-1M tokens
-            selected_model = "gemini-2.0-flash"
-        elif messages_tokens > 128000:  # 128K-200K tokens
-            selected_model = "claude-3-5-sonnet-latest"
-        else:  # <128K tokens
-            selected_model = model_name
+        # Calculate token count for context window management; most prompts
+        # are far below the smallest threshold and skip the tokenizer
+        if _within_tokens((SYSTEM_PROMPT, user_prompt), 128000):
+            messages_tokens = 0
+        else:
+            messages_tokens = _system_prompt_tokens() + _token_count(user_prompt)
+
+        # Determine the appropriate model based on token count; above 1M
+        # tokens the prompt is chunked by generate_mdc_response
+        needs_large_context = messages_tokens > LARGE_CONTEXT_TOKENS
+        selected_model = _model_for_tokens(messages_tokens, model_name)
 
         return (
             directory,
@@ -182,46 +189,74 @@ async def prepare_directory_mdc(
         )
 
     except Exception as e:
-        logging.error("Error generating directory MDC for {}: {}".format(directory, e))
+        logging.error("Error generating directory MDC for %s: %s", directory, e)
         return None
 
 
+def find_cycles(dependency_graph, limit=5):
+    """
+    Return up to limit circular dependencies (all if None), one per strongly
+    connected component.
+
+    Enumerating every simple cycle is exponential on dense graphs, while the
+    prompt only shows a handful; finding the SCCs and one cycle inside each
+    is linear in the size of the graph.
+    """
+    cycles = []
+    for scc in nx.strongly_connected_components(dependency_graph):
+        if limit is not None and len(cycles) >= limit:
+            break
+        if len(scc) == 1:
+            node = next(iter(scc))
+            if dependency_graph.has_edge(node, node):
+                cycles.append([node])
+            continue
+        edges = nx.find_cycle(dependency_graph.subgraph(scc))
+        cycles.append([u for u, _ in edges])
+    return cycles
+
+
 async def generate_high_level_mdc(
     file_snippets_dict,
     dependency_graph,
     output_dir,
     model_name="gpt-4o-mini",
     temperature=0.3,
+    semaphore=None,
+    graph_context=None,
+    response_cache=None,
 ):
     """
     Generate a high-level MDC file for the entire repository.
 
     Args:
-        repo_path: Path to the repository
         file_snippets_dict: Dictionary of code snippets for all files
         dependency_graph: NetworkX DiGraph with dependency information
         output_dir: Directory to write the MDC file
         model_name: OpenAI model to use
         temperature: Temperature for generation
+        semaphore: Optional asyncio.Semaphore bounding concurrent LLM requests
+        graph_context: Precomputed GraphContext; built from the graph if omitted
+        response_cache: Optional ResponseCache to answer repeated prompts from
 
     Returns:
         Path to the generated MDC file
     """
+    if graph_context is None:
+        graph_context = GraphContext(dependency_graph, file_snippets_dict.keys())
+
     try:
         # Create repository-level MDC path with flattened structure
         repo_mdc_path = os.path.join(output_dir, "_repository.mdc")
-        os.makedirs(os.path.dirname(repo_mdc_path), exist_ok=True)
 
         # Get top-level directories
-        directories = {
-            os.path.dirname(f) for f in file_snippets_dict.keys() if os.path.dirname(f)
-        }
+        directories = {d for d in graph_context.dir_files if d}
 
-        # Analyze core modules (most imported files)
-        in_degree = sorted(
-            [(n, dependency_graph.in_degree(n)) for n in dependency_graph.nodes()],
+        # Analyze core modules (most imported files); the prompt shows the top 10
+        in_degree = heapq.nlargest(
+            10,
+            ((n, len(preds)) for n, (preds, _) in graph_context.neighbors.items()),
             key=lambda x: x[1],
-            reverse=True,
         )
         core_modules = [
             (n, d) for n, d in in_degree if d >= 3
@@ -230,14 +265,14 @@ async def generate_high_level_mdc(
         # Try to identify entry points
         entry_points = [
             n
-            for n in dependency_graph.nodes()
-            if dependency_graph.out_degree(n) > 0 and dependency_graph.in_degree(n) == 0
+            for n, (preds, succs) in graph_context.neighbors.items()
+            if succs and not preds
         ]
 
         # Identify circular dependencies
         cycles = []
         try:
-            cycles = list(nx.simple_cycles(dependency_graph))
+            cycles = find_cycles(dependency_graph)
         except Exception:
             pass
 
@@ -247,48 +282,71 @@ async def generate_high_level_mdc(
         )
 
         # Generate MDC content
-        response = await generate_mdc_response(
+        response = await bounded(semaphore, generate_mdc_response(
             system_prompt=SYSTEM_PROMPT,
             user_prompt=user_prompt,
             model_name=model_name,
             temperature=temperature,
-        )
+            response_cache=response_cache,
+        ))
 
         # Write MDC file
-        write_mdc_file(repo_mdc_path, response)
+        await awrite_mdc_file(repo_mdc_path, response)
         return repo_mdc_path
 
     except Exception as e:
-        logging.error("Error generating repository MDC: {}".format(e))
+        logging.error("Error generating repository MDC: %s", e)
         return None
 
 
-def write_mdc_file(output_path, mdc_content):
+def write_mdc_file(output_path, mdc_content, create_dir=True):
     """
     Write the MDC content to a file.
 
     Args:
         output_path: Path to write the MDC file
         mdc_content: MDCResponse object with the content
+        create_dir: Create the parent directory if it is missing. It is only
+            created after opening the file fails, so writing into an existing
+            directory costs no extra filesystem calls either way
     """
     try:
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            # Write the frontmatter
-            f.write("---\n")
-            f.write("description: {}\n".format(mdc_content.description))
-            f.write("globs: {}\n".format(mdc_content.globs))
-            f.write("alwaysApply: {}\n".format(str(mdc_content.always_apply).lower()))
-            f.write("---\n\n")
+        # JSON scalars and lists are valid YAML, so a description with a colon
+        # or newline, or a list of globs, cannot break the frontmatter
+        frontmatter = "---\ndescription: {}\nglobs: {}\nalwaysApply: {}\n---\n\n".format(
+            json.dumps(mdc_content.description),
+            json.dumps(list(mdc_content.globs)),
+            json.dumps(bool(mdc_content.always_apply)),
+        )
 
-            # Write the content
-            f.write(mdc_content.content)
+        # Write the frontmatter and content in one call
+        try:
+            f = open(output_path, "w", encoding="utf-8")
+        except FileNotFoundError:
+            if not create_dir:
+                raise
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            f = open(output_path, "w", encoding="utf-8")
+        with f:
+            f.write(frontmatter + mdc_content.content)
 
         # Only log at DEBUG level to reduce verbosity
-        logging.debug("MDC file created: {}".format(output_path))
+        logging.debug("MDC file created: %s", output_path)
     except Exception as e:
-        logging.error("Error writing MDC file {}: {}".format(output_path, e))
+        logging.error("Error writing MDC file %s: %s", output_path, e)
+
+
+# MDC writes get their own threads, so slow filesystems neither block the
+# event loop nor queue behind other work on the default executor
+_WRITE_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="mdc-write")
+
+
+async def awrite_mdc_file(output_path, mdc_content, create_dir=True):
+    """Run write_mdc_file on the write pool so the event loop keeps serving LLM requests."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(
+        _WRITE_POOL, functools.partial(write_mdc_file, output_path, mdc_content, create_dir=create_dir)
+    )
 
 
 async def generate_mdc_files(
@@ -303,6 +361,9 @@ async def generate_mdc_files(
     check_quality=False,
     update_poor_quality=False,
     analysis_output_dir=None,
+    max_concurrency=20,
+    use_batch_api=False,
+    response_cache=None,
 ):
     """
     Generate MDC files for all files, directories, and the repository.
@@ -319,13 +380,18 @@ async def generate_mdc_files(
         check_quality: If True, check quality of existing MDC files before generating
         update_poor_quality: If True, only update MDC files with poor quality (requires check_quality=True)
         analysis_output_dir: Directory to save quality analysis reports
+        max_concurrency: Maximum number of LLM requests in flight across all phases
+        use_batch_api: If True, submit file and directory prompts as OpenAI Batch API
+            jobs (half the cost, slower turnaround); non-OpenAI models use live requests
+        response_cache: Optional ResponseCache; prompts answered before are not sent again
 
     Returns:
         List of paths to generated MDC files
     """
     mdc_files = []
 
-    # Create output directory
+    # Create output directory; every MDC is written directly into it, so
+    # this is the only directory the phases below need
     os.makedirs(output_dir, exist_ok=True)
     
     # Quality check and filtering if enabled
@@ -333,8 +399,7 @@ async def generate_mdc_files(
     if check_quality:
         log_section("MDC Quality Analysis")
         
-        expected_files = list(file_data.keys())
-        quality_report = scan_existing_mdc_files(output_dir, expected_files)
+        quality_report = scan_existing_mdc_files(output_dir, file_data.keys())
         
         # Print summary to console
         print("\n" + quality_report.get_summary())
@@ -357,46 +422,222 @@ async def generate_mdc_files(
                 }, "Quality Check Complete")
                 return mdc_files
 
+    # Files, directories and the repository summary do not depend on each
+    # other, so all three phases run at once under one request limit
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    # Query the graph once; every phase reads from these lookups
+    graph_context = GraphContext(dependency_graph, file_data.keys())
+
+    async def no_mdcs():
+        return []
+
+    if not skip_directory_mdcs and max_directory_depth > 0:
+        directory_phase = _generate_directory_mdcs(
+            file_data, graph_context, output_dir, model_name, max_directory_depth, semaphore,
+            use_batch_api, response_cache,
+        )
+    else:
+        if skip_directory_mdcs:
+            logging.info("Skipping directory MDC generation as requested")
+        else:
+            logging.info("No directories within max depth of %s", max_directory_depth)
+        directory_phase = no_mdcs()
+
+    if not skip_repository_mdc:
+        repository_phase = generate_high_level_mdc(
+            file_data,
+            dependency_graph,
+            output_dir,
+            model_name,
+            semaphore=semaphore,
+            graph_context=graph_context,
+            response_cache=response_cache,
+        )
+    else:
+        logging.info("Skipping repository MDC generation as requested")
+        repository_phase = no_mdcs()
+
+    file_mdcs, dir_mdcs, repo_mdc_path = await asyncio.gather(
+        _generate_file_mdcs(
+            file_data, graph_context, output_dir, model_name, include_import_rules, semaphore,
+            use_batch_api, response_cache,
+        ),
+        directory_phase,
+        repository_phase,
+    )
+
+    mdc_files.extend(file_mdcs)
+    mdc_files.extend(dir_mdcs)
+    if repo_mdc_path:
+        mdc_files.append(repo_mdc_path)
+
+    return mdc_files
+
+
+def _flat_path(path):
+    """Path with separators replaced by "_", as used for flat MDC file names."""
+    return path.replace("/", "_").replace("\\", "_")
+
+
+def _snippets_digest(snippets):
+    """
+    Content hash of a file's snippets, or None for files too small to dedupe.
+
+    Small files (a few imports, an __init__.py) are often identical while
+    meaning different things in different packages, so they are not treated
+    as copies.
+    """
+    if sum(snippet["content"].count("\n") for snippet in snippets) < SMALL_FILE_LINES:
+        return None
+    digest = hashlib.sha256()
+    for snippet in snippets:
+        digest.update(snippet["content"].encode("utf-8", "surrogatepass"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+# Token budget for a file's snippets when its prompt is too large even for
+# the large-context models, leaving room in a 128K context window for the
+# rest of the prompt and the response
+FILE_PROMPT_TOKEN_BUDGET = 100000
+
+# Prompts built between yields to the event loop while preparing file MDCs
+PROMPT_BUILD_CHUNK = 64
+
+
+def _truncate_to_tokens(content, limit):
+    """
+    Head of content within about limit tokens, cut at a line boundary and
+    followed by a "[truncated]" marker saying how many lines were left out.
+    """
+    tokenizer = get_tokenizer("gpt-4o")
+    lines = content.count("\n") + 1
+    # The marker is part of the limit; reserve room for its longest form
+    reserve = _token_count("\n[truncated: {} more lines]\n".format(lines))
+    head = tokenizer.decode(tokenize(content, tokenizer)[:max(limit - reserve, 0)])
+    if "\n" in head:
+        head = head[:head.rindex("\n") + 1]
+        kept = head.count("\n")
+    else:
+        # At most part of the first line fits; keep its start
+        kept = 0
+        if head:
+            head += "\n"
+    return "{}[truncated: {} more lines]\n".format(head, lines - kept)
+
+
+def _fit_snippets_to_budget(file_path, snippets):
+    """
+    Truncate a file's snippets so that they fit in FILE_PROMPT_TOKEN_BUDGET.
+
+    The largest snippets are cut down to their head first, each ending in a
+    "[truncated]" marker, until the total fits. Files already within budget
+    are returned unchanged.
+    """
+    if _within_tokens((snippet["content"] for snippet in snippets), FILE_PROMPT_TOKEN_BUDGET):
+        return snippets
+    counts = [_token_count(snippet["content"]) for snippet in snippets]
+    total = sum(counts)
+    if total <= FILE_PROMPT_TOKEN_BUDGET:
+        return snippets
+
+    trimmed = list(snippets)
+    for idx in sorted(range(len(snippets)), key=counts.__getitem__, reverse=True):
+        excess = total - FILE_PROMPT_TOKEN_BUDGET
+        if excess <= 0:
+            break
+        content = _truncate_to_tokens(snippets[idx]["content"], counts[idx] - excess)
+        trimmed[idx] = dict(snippets[idx], content=content)
+        total -= counts[idx] - _token_count(content)
+
+    logging.warning(
+        "%s exceeds the prompt budget of %d tokens; "
+        "some snippets were truncated (%d tokens sent)",
+        file_path, FILE_PROMPT_TOKEN_BUDGET, total,
+    )
+    return trimmed
+
+
+async def _generate_file_mdcs(
+    file_data,
+    graph_context,
+    output_dir,
+    model_name,
+    include_import_rules,
+    semaphore,
+    use_batch_api,
+    response_cache,
+):
+    """Generate and write the file-level MDCs; returns the paths written."""
+    mdc_files = []
+
     # Batch preparation for file-specific MDCs
     file_prompts = []
+    file_models = []
     file_paths = []
     file_output_paths = []
-
-    for file_path, snippets in file_data.items():
+    # Copies of a file seen earlier (vendored or generated code) are not sent
+    # to the LLM; they get a rule pointing at the first copy's MDC instead
+    canonical_by_digest = {}
+    duplicates = []
+    # MDC names are the file paths with separators flattened to "_"
+    flat_paths = {file_path: _flat_path(file_path) for file_path in file_data}
+
+    for count, (file_path, snippets) in enumerate(file_data.items(), 1):
         if not snippets:  # Skip files with no content
             continue
-
-        # Get dependency information
-        imported_by = []
-        imports = []
-
-        if file_path in dependency_graph.nodes():
-            # Files that import this file
-            imported_by = [pred for pred in dependency_graph.predecessors(file_path)]
-            # Files that this file imports
-            imports = [succ for succ in dependency_graph.successors(file_path)]
-
-        # Build the prompt with file content and dependencies
+        if count % PROMPT_BUILD_CHUNK == 0:
+            # Building prompts is CPU work; yield now and then so the directory
+            # and repository phases can send requests and write their results
+            # while the file prompts are still being prepared
+            await asyncio.sleep(0)
+
+        digest = _snippets_digest(snippets)
+        if digest is not None:
+            canonical = canonical_by_digest.setdefault(digest, file_path)
+            if canonical != file_path:
+                duplicates.append((file_path, canonical))
+                continue
+
+        # Get dependency information: files that import this file and
+        # files that this file imports
+        imported_by = graph_context.imported_by(file_path)
+        imports = graph_context.imports(file_path)
+
+        # Build the prompt with file content and dependencies. Large files go
+        # to a model with a larger context window, like large directories;
+        # only files too large even for those are truncated
         user_prompt = format_file_prompt(file_path, snippets, imports, imported_by)
+        selected_model = model_name
+        if not _within_tokens((SYSTEM_PROMPT, user_prompt), 128000):
+            messages_tokens = _system_prompt_tokens() + _token_count(user_prompt)
+            if messages_tokens > LARGE_CONTEXT_TOKENS:
+                snippets = _fit_snippets_to_budget(file_path, snippets)
+                user_prompt = format_file_prompt(file_path, snippets, imports, imported_by)
+            else:
+                selected_model = _model_for_tokens(messages_tokens, model_name)
+        file_models.append(selected_model)
         file_prompts.append(
             {"system_prompt": SYSTEM_PROMPT, "user_prompt": user_prompt}
         )
         file_paths.append(file_path)
 
         # Create flattened output path
-        flat_file_path = file_path.replace("/", "_").replace("\\", "_")
-        file_output_paths.append(os.path.join(output_dir, f"{flat_file_path}.mdc"))
+        file_output_paths.append(os.path.join(output_dir, f"{flat_paths[file_path]}.mdc"))
 
     # Log start of batch processing
     log_section("Generating MDC Files", 80)
-    logging.info(f"Processing {len(file_prompts)} files...")
+    logging.info("Processing %d files...", len(file_prompts))
     
     # Batch generate file MDCs
     file_responses = await batch_generate_mdc_responses(
-        prompts=file_prompts, model_name=model_name
+        prompts=file_prompts, model_names=file_models, semaphore=semaphore,
+        use_batch_api=use_batch_api, response_cache=response_cache,
     )
 
-    # Write MDC files for files
+    # Write MDC files for files; the writes run concurrently off the event loop
+    writes = []
     total_files = len(file_paths)
     success_count = 0
     failed_count = 0
@@ -404,135 +645,170 @@ async def generate_mdc_files(
     for idx, (file_path, output_path, response) in enumerate(zip(
         file_paths, file_output_paths, file_responses
     ), 1):
-        folder = os.path.dirname(file_path) if os.path.dirname(file_path) else "."
+        folder = graph_context.dir_of[file_path] or "."
         filename = os.path.basename(file_path)
         
         if response:
-            if include_import_rules and file_path in dependency_graph.nodes():
-                imports = [succ for succ in dependency_graph.successors(file_path)]
+            if include_import_rules:
+                imports = graph_context.imports(file_path)
                 if imports:
-                    import_references = "\n\n## Imported Files\n"
-                    for imported_file in imports:
-                        # Create flattened reference path
-                        flat_import_path = imported_file.replace("/", "_").replace(
-                            "\\", "_"
+                    # Append references to the imported files' MDCs
+                    response.content += "\n\n## Imported Files\n" + "".join(
+                        "@file {}.mdc\n".format(
+                            flat_paths[imported_file]
+                            if imported_file in flat_paths
+                            else _flat_path(imported_file)
                         )
-                        import_references += f"@file {flat_import_path}.mdc\n"
-
-                    # Append the import references to the content
-                    response.content += import_references
+                        for imported_file in imports
+                    )
 
-            write_mdc_file(output_path, response)
+            writes.append(awrite_mdc_file(output_path, response, create_dir=False))
             mdc_files.append(output_path)
             success_count += 1
             log_processing_file(folder, filename, idx, total_files, "success")
         else:
             failed_count += 1
             log_processing_file(folder, filename, idx, total_files, "failed")
+
+    generated = set(file_paths[i] for i, response in enumerate(file_responses) if response)
+    for file_path, canonical in duplicates:
+        if canonical not in generated:
+            failed_count += 1
+            continue
+        output_path = os.path.join(output_dir, f"{flat_paths[file_path]}.mdc")
+        flat_canonical = flat_paths[canonical]
+        duplicate_rule = MDCResponse(
+            description="Identical copy of {}; see that file's rule".format(canonical),
+            globs=[file_path],
+            always_apply=False,
+            content="# {}\n\nThis file has the same content as `{}`.\n\n@file {}.mdc\n".format(
+                file_path, canonical, flat_canonical
+            ),
+        )
+        writes.append(awrite_mdc_file(output_path, duplicate_rule, create_dir=False))
+        mdc_files.append(output_path)
+        success_count += 1
+    await asyncio.gather(*writes)
     
     # Log completion summary
-    logging.info(f"\nFile processing complete: {success_count} succeeded, {failed_count} failed")
+    if duplicates:
+        logging.info("%d files are copies of other files and point to their MDC", len(duplicates))
+    logging.info("\nFile processing complete: %d succeeded, %d failed", success_count, failed_count)
 
-    # Generate directory MDCs if not skipped
-    if not skip_directory_mdcs and max_directory_depth > 0:
-        # Get all directories from file paths
-        all_directories = {
-            os.path.dirname(f) for f in file_data.keys() if os.path.dirname(f)
-        }
+    return mdc_files
 
-        # Filter directories based on depth
-        directories_to_process = []
-        for directory in all_directories:
-            # Calculate directory depth (number of path separators)
-            depth = directory.count(os.path.sep) + 1
-            if depth <= max_directory_depth:
-                directories_to_process.append(directory)
 
-        logging.info(
-            f"Generating MDC files for {len(directories_to_process)} directories (max depth: {max_directory_depth})"
-        )
+async def _generate_directory_mdcs(
+    file_data,
+    graph_context,
+    output_dir,
+    model_name,
+    max_directory_depth,
+    semaphore,
+    use_batch_api,
+    response_cache,
+):
+    """Generate and write the directory-level MDCs; returns the paths written."""
+    mdc_files = []
 
-        # Batch preparation for directory-specific MDCs
-        dir_prompts = []
-        dir_paths = []
-        dir_models = []
-        large_context_dirs = []
+    # Filter directories based on depth; the root ("") is covered by the
+    # repository MDC
+    directories_to_process = []
+    for directory in graph_context.dir_files:
+        if not directory:
+            continue
+        # Calculate directory depth (number of path separators)
+        depth = directory.count(os.path.sep) + 1
+        if depth <= max_directory_depth:
+            directories_to_process.append(directory)
+
+    logging.info(
+        "Generating MDC files for %d directories (max depth: %s)",
+        len(directories_to_process), max_directory_depth,
+    )
 
-        # Prepare all directory prompts
-        for directory in directories_to_process:
-            result = await prepare_directory_mdc(
+    # Batch preparation for directory-specific MDCs
+    dir_prompts = []
+    dir_paths = []
+    dir_models = []
+    large_context_dirs = []
+
+    # Prepare all directory prompts; failures are logged and come back as None
+    results = await asyncio.gather(
+        *(
+            prepare_directory_mdc(
                 directory,
                 file_data,
-                dependency_graph,
+                graph_context.graph,
                 output_dir,
                 model_name,
+                graph_context=graph_context,
             )
+            for directory in directories_to_process
+        )
+    )
 
-            if result:
-                (
-                    directory,
-                    dir_mdc_path,
-                    user_prompt,
-                    selected_model,
-                    needs_large_context,
-                ) = result
-
-                if needs_large_context:
-                    large_context_dirs.append((directory, dir_mdc_path, user_prompt))
-                else:
-                    dir_prompts.append(
-                        {"system_prompt": SYSTEM_PROMPT, "user_prompt": user_prompt}
-                    )
-                    dir_paths.append(dir_mdc_path)
-                    dir_models.append(selected_model)
-
-        # Process regular directories in batch with their respective models
-        if dir_prompts:
-            dir_responses = await batch_generate_mdc_responses(
-                prompts=dir_prompts, model_names=dir_models
-            )
-
-            # Write MDC files for directories
-            for dir_path, response in zip(dir_paths, dir_responses):
-                if response:
-                    write_mdc_file(dir_path, response)
-                    mdc_files.append(dir_path)
-
-        # Process large context directories individually
-        for directory, dir_mdc_path, user_prompt in large_context_dirs:
-            logging.warning(f"Processing large directory: {directory}")
-            try:
-                response = await generate_mdc_response(
-                    system_prompt=SYSTEM_PROMPT,
-                    user_prompt=user_prompt,
-                    model_name=model_name,  # Will be overridden based on token count
-                    temperature=0.0,
-                )
-
-                if response:
-                    write_mdc_file(dir_mdc_path, response)
-                    mdc_files.append(dir_mdc_path)
-            except Exception as e:
-                logging.error(
-                    f"Error processing large context directory {directory}: {e}"
+    for result in results:
+        if result:
+            (
+                directory,
+                dir_mdc_path,
+                user_prompt,
+                selected_model,
+                needs_large_context,
+            ) = result
+
+            if needs_large_context:
+                large_context_dirs.append((directory, dir_mdc_path, user_prompt))
+            else:
+                dir_prompts.append(
+                    {"system_prompt": SYSTEM_PROMPT, "user_prompt": user_prompt}
                 )
+                dir_paths.append(dir_mdc_path)
+                dir_models.append(selected_model)
+
+    # Process regular directories in batch with their respective models
+    if dir_prompts:
+        dir_responses = await batch_generate_mdc_responses(
+            prompts=dir_prompts, model_names=dir_models, semaphore=semaphore,
+            use_batch_api=use_batch_api, response_cache=response_cache,
+        )
 
-    elif skip_directory_mdcs:
-        logging.info("Skipping directory MDC generation as requested")
-    else:
-        logging.info(f"No directories within max depth of {max_directory_depth}")
+        # Write MDC files for directories
+        writes = []
+        for dir_path, response in zip(dir_paths, dir_responses):
+            if response:
+                writes.append(awrite_mdc_file(dir_path, response, create_dir=False))
+                mdc_files.append(dir_path)
+        await asyncio.gather(*writes)
+
+    # Process large context directories individually, all at once under the
+    # shared request limit
+    for directory, _, _ in large_context_dirs:
+        logging.warning("Processing large directory: %s", directory)
+    large_responses = await asyncio.gather(
+        *(
+            bounded(semaphore, generate_mdc_response(
+                system_prompt=SYSTEM_PROMPT,
+                user_prompt=user_prompt,
+                model_name=model_name,  # Will be overridden based on token count
+                temperature=0.0,
+                response_cache=response_cache,
+            ))
+            for _, _, user_prompt in large_context_dirs
+        ),
+        return_exceptions=True,
+    )
 
-    # Generate high-level repository MDC if not skipped
-    if not skip_repository_mdc:
-        repo_mdc_path = await generate_high_level_mdc(
-            file_data,
-            dependency_graph,
-            output_dir,
-            model_name,
-        )
-        if repo_mdc_path:
-            mdc_files.append(repo_mdc_path)
-    else:
-        logging.info("Skipping repository MDC generation as requested")
+    writes = []
+    for (directory, dir_mdc_path, _), response in zip(large_context_dirs, large_responses):
+        if isinstance(response, Exception):
+            logging.error(
+                "Error processing large context directory %s: %s", directory, response
+            )
+        elif response:
+            writes.append(awrite_mdc_file(dir_mdc_path, response, create_dir=False))
+            mdc_files.append(dir_mdc_path)
+    await asyncio.gather(*writes)
 
     return mdc_files
@@ -4,6 +4,7 @@ FastAPI-based key provider for retrieving LLM API keys from a FastAPI service.
 
 import os
 import logging
+import time
 from typing import Optional, Dict
 from .key_provider import KeyProvider
 
@@ -13,6 +14,24 @@ except ImportError:
     requests = None
 
 
+# Seconds fetched keys are reused when neither ttl nor FASTAPI_KEY_TTL is set
+DEFAULT_KEY_TTL = 300.0
+
+
+def _ttl_from_env() -> float:
+    """Read FASTAPI_KEY_TTL, falling back to DEFAULT_KEY_TTL if unset or malformed."""
+    value = os.environ.get("FASTAPI_KEY_TTL")
+    if value is None:
+        return DEFAULT_KEY_TTL
+    try:
+        return float(value)
+    except ValueError:
+        logging.warning(
+            f"Ignoring invalid FASTAPI_KEY_TTL {value!r}; using {DEFAULT_KEY_TTL:g} seconds"
+        )
+        return DEFAULT_KEY_TTL
+
+
 class FastAPIKeyProvider(KeyProvider):
     """Provides API keys through a FastAPI service."""
 
@@ -20,6 +39,7 @@ class FastAPIKeyProvider(KeyProvider):
         self,
         api_endpoint: Optional[str] = None,
         api_key: Optional[str] = None,
+        ttl: Optional[float] = None,
     ):
         """
         Initialize FastAPI key provider.
@@ -27,10 +47,16 @@ class FastAPIKeyProvider(KeyProvider):
         Args:
             api_endpoint: FastAPI endpoint URL for retrieving keys
             api_key: API key for authenticating with the FastAPI service
+            ttl: Seconds fetched keys are reused before the endpoint is asked
+                again (defaults to FASTAPI_KEY_TTL, or 300)
         """
         self.api_endpoint = api_endpoint or os.environ.get("FASTAPI_KEY_ENDPOINT")
         self.api_key = api_key or os.environ.get("FASTAPI_API_KEY")
+        self.ttl = ttl if ttl is not None else _ttl_from_env()
         self._keys_cache: Dict[str, str] = {}
+        # Monotonic time of the last fetch attempt, successful or not
+        self._last_fetch: Optional[float] = None
+        self._session = None
 
     def _fetch_keys(self) -> bool:
         """
@@ -52,7 +78,10 @@ class FastAPIKeyProvider(KeyProvider):
             if self.api_key:
                 headers["X-API-Key"] = self.api_key
             
-            response = requests.get(
+            # One keep-alive session so repeated fetches reuse the connection
+            if self._session is None:
+                self._session = requests.Session()
+            response = self._session.get(
                 f"{self.api_endpoint}/llm-keys",
                 headers=headers,
                 timeout=10,
@@ -79,10 +108,13 @@ class FastAPIKeyProvider(KeyProvider):
         Returns:
             API key if available, None otherwise
         """
-        if not self._keys_cache:
-            if not self._fetch_keys():
-                return None
-        
+        # Refetch only once the TTL has passed; failed attempts count too, so
+        # an unreachable endpoint is not retried for every provider lookup
+        now = time.monotonic()
+        if self._last_fetch is None or now - self._last_fetch > self.ttl:
+            self._last_fetch = now
+            self._fetch_keys()
+
         return self._keys_cache.get(provider.lower())
 
     def is_available(self) -> bool:
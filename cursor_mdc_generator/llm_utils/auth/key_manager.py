@@ -11,6 +11,10 @@ from .service_account_key_provider import ServiceAccountKeyProvider
 from .fastapi_key_provider import FastAPIKeyProvider
 
 
+# LLM providers the CLIs look up keys for
+LLM_PROVIDERS = ["openai", "anthropic", "gemini", "deepseek"]
+
+
 class KeyManager:
     """Manages multiple key providers and provides a unified interface for key retrieval."""
 
@@ -32,6 +36,28 @@ class KeyManager:
             ]
         else:
             self.providers = providers
+        # Key sources that are configured, probed once on first lookup; the
+        # keys themselves are not cached here, each source manages its own
+        # expiry (see FastAPIKeyProvider's TTL)
+        self._available: Optional[List[KeyProvider]] = None
+
+    def _available_key_providers(self) -> List[KeyProvider]:
+        """Return the key sources whose is_available() check passed."""
+        if self._available is None:
+            self._available = []
+            for key_provider in self.providers:
+                try:
+                    if key_provider.is_available():
+                        self._available.append(key_provider)
+                except Exception as e:
+                    logging.warning(
+                        f"Error checking {key_provider.__class__.__name__}: {e}"
+                    )
+        return self._available
+
+    def clear_cache(self) -> None:
+        """Forget which sources are available so the next lookup probes them again."""
+        self._available = None
 
     def get_key(self, provider: str) -> Optional[str]:
         """
@@ -43,15 +69,14 @@ class KeyManager:
         Returns:
             API key if available from any provider, None otherwise
         """
-        for key_provider in self.providers:
+        for key_provider in self._available_key_providers():
             try:
-                if key_provider.is_available():
-                    key = key_provider.get_key(provider)
-                    if key:
-                        logging.debug(
-                            f"API key for {provider} obtained from {key_provider.__class__.__name__}"
-                        )
-                        return key
+                key = key_provider.get_key(provider)
+                if key:
+                    logging.debug(
+                        f"API key for {provider} obtained from {key_provider.__class__.__name__}"
+                    )
+                    return key
             except Exception as e:
                 logging.warning(
                     f"Error getting key from {key_provider.__class__.__name__}: {e}"
@@ -68,8 +93,7 @@ class KeyManager:
         Returns:
             True if at least one key is available, False otherwise
         """
-        providers = ["openai", "anthropic", "gemini", "deepseek"]
-        return any(self.get_key(provider) for provider in providers)
+        return bool(self.get_available_providers())
 
     def get_available_providers(self) -> List[str]:
         """
@@ -78,8 +102,7 @@ class KeyManager:
         Returns:
             List of provider names with available keys
         """
-        providers = ["openai", "anthropic", "gemini", "deepseek"]
-        return [p for p in providers if self.get_key(p)]
+        return [p for p in LLM_PROVIDERS if self.get_key(p)]
 
 
 # Global key manager instance
@@ -1,9 +1,16 @@
 import asyncio
+import functools
 import logging
 from typing import List, Dict, Any, Optional
+import httpx
+import litellm
 from litellm import Router, completion_cost
 from pydantic import BaseModel
+import hashlib
 import json
+import os
+import random
+import sqlite3
 import threading
 
 from .model_lists import chat_model_list
@@ -16,21 +23,80 @@ logging.getLogger('litellm').setLevel(logging.WARNING)
 logging.getLogger('LiteLLM').setLevel(logging.WARNING)
 logging.getLogger('LiteLLM Router').setLevel(logging.WARNING)
 
-# Configure litellm Router
-router = Router(
-    model_list=chat_model_list,
-    num_retries=3,
-    timeout=30,
-    routing_strategy="least-busy",  # Use least-busy strategy for optimal throughput
-    fallbacks=[],  # General fallbacks for any error
-    context_window_fallbacks=[
-        {"gpt-4o-mini": ["gemini-2.0-flash"]},
-        {"gpt-4o": ["gemini-2.0-flash"]},
-        {"deepseek-chat": ["gemini-2.0-flash"]},
-        {"o1": ["gemini-2.0-flash"]},
-    ],  # Specific fallbacks for context window exceeded errors
+
+
+def _make_http_client() -> httpx.AsyncClient:
+    """One pooled client for all OpenAI-compatible requests, on HTTP/2 if h2 is installed."""
+    options = dict(
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+        timeout=httpx.Timeout(120.0, connect=10.0),
+    )
+    try:
+        return httpx.AsyncClient(http2=True, **options)
+    except ImportError:  # h2 is optional (mdcgen[speedups])
+        return httpx.AsyncClient(**options)
+
+
+# Built on first use, inside the running event loop, and dropped again by
+# close_http_client so that a later run starts with a fresh client
+_router: Optional[Router] = None
+
+
+def _get_router() -> Router:
+    """The litellm Router, created together with the pooled HTTP client it uses."""
+    global _router
+    if _router is None:
+        # Set before the Router is built so that the clients it creates share the pool
+        litellm.aclient_session = _make_http_client()
+        _router = Router(
+            model_list=chat_model_list,
+            num_retries=0,  # Transient errors are retried by acompletion_with_retries
+            timeout=30,
+            routing_strategy="least-busy",  # Use least-busy strategy for optimal throughput
+            fallbacks=[],  # General fallbacks for any error
+            context_window_fallbacks=[
+                {"gpt-4o-mini": ["gemini-2.0-flash"]},
+                {"gpt-4o": ["gemini-2.0-flash"]},
+                {"deepseek-chat": ["gemini-2.0-flash"]},
+                {"o1": ["gemini-2.0-flash"]},
+            ],  # Specific fallbacks for context window exceeded errors
+        )
+    return _router
+
+
+async def close_http_client() -> None:
+    """
+    Close the pooled HTTP client; call once when a run is done with the LLM.
+
+    The Router and client are rebuilt on the next request, so the module
+    stays usable afterwards (e.g. from a second event loop).
+    """
+    global _router
+    session = litellm.aclient_session
+    litellm.aclient_session = None
+    _router = None
+    if session is not None:
+        await session.aclose()
+
+# Transient provider errors that are worth retrying with backoff
+RETRYABLE_ERRORS = tuple(
+    getattr(litellm, name)
+    for name in (
+        "RateLimitError",
+        "APIConnectionError",
+        "Timeout",
+        "ServiceUnavailableError",
+        "InternalServerError",
+    )
+    if hasattr(litellm, name)
 )
 
+# Retry policy for RETRYABLE_ERRORS (seconds)
+MAX_ATTEMPTS = 5
+_BACKOFF_BASE = 1.0
+_BACKOFF_MAX = 30.0
+_RETRY_AFTER_MAX = 60.0
+
 # Global cost tracking with thread safety
 _cost_lock = threading.Lock()
 _total_cost = 0.0
@@ -55,7 +121,53 @@ def add_to_total_cost(cost: float) -> None:
     with _cost_lock:
         _total_cost += cost
     # Only log at DEBUG level to reduce verbosity
-    logging.debug(f"Added ${cost:.6f} to total. Current total: ${_total_cost:.6f}")
+    logging.debug("Added $%.6f to total. Current total: $%.6f", cost, _total_cost)
+
+
+class ResponseCache:
+    """
+    On-disk cache of MDC responses keyed by model, temperature and prompt.
+
+    Rerunning on unchanged code sends identical prompts; those are answered
+    from here instead of the API. Changing any input changes the key.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS mdc_responses (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+        )
+
+    @staticmethod
+    def key(model_name: Optional[str], temperature: float, system_prompt: str, user_prompt: str) -> str:
+        text = "\0".join((str(model_name), repr(temperature), system_prompt, user_prompt))
+        return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def get(self, key: str) -> Optional[MDCResponse]:
+        row = self.conn.execute(
+            "SELECT response FROM mdc_responses WHERE key=?", (key,)
+        ).fetchone()
+        return MDCResponse.model_validate_json(row[0]) if row else None
+
+    def put_many(self, items: List[tuple[str, MDCResponse]]) -> None:
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO mdc_responses (key, response) VALUES (?, ?)",
+            [(key, response.model_dump_json()) for key, response in items],
+        )
+        # Commit right away so that responses survive an interrupted run
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "ResponseCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
 
 def text_cost_parser(completion: Any) -> tuple[str, float]:
@@ -72,6 +184,57 @@ def text_cost_parser(completion: Any) -> tuple[str, float]:
     return content, cost
 
 
+@functools.lru_cache(maxsize=None)
+def _response_format(response_model: type) -> Dict[str, Any]:
+    """
+    Strict json_schema response_format for a Pydantic model.
+
+    Built once per model instead of letting litellm convert the class on
+    every request; providers with Structured Outputs then enforce the schema
+    server-side.
+    """
+    from litellm.utils import type_to_response_format_param
+
+    return type_to_response_format_param(response_model)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds requested by a Retry-After header on the error's HTTP response, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return min(float(headers.get("retry-after")), _RETRY_AFTER_MAX)
+    except (TypeError, ValueError):
+        return None
+
+
+async def acompletion_with_retries(**kwargs: Any) -> Any:
+    """
+    router.acompletion, retrying transient provider errors.
+
+    RETRYABLE_ERRORS (rate limits, timeouts, connection errors, 5xx) are
+    retried up to MAX_ATTEMPTS times with exponential backoff and jitter,
+    waiting at least as long as a Retry-After header asks. Other errors, and
+    transient ones that outlast the retries, propagate.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return await _get_router().acompletion(**kwargs)
+        except RETRYABLE_ERRORS as e:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = min(_BACKOFF_BASE * 2 ** attempt, _BACKOFF_MAX) + random.uniform(0, _BACKOFF_BASE)
+            retry_after = _retry_after(e)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            logging.warning(
+                "Transient error from %s, retrying in %.1fs (attempt %d/%d): %s",
+                kwargs.get("model"), delay, attempt + 1, MAX_ATTEMPTS, e,
+            )
+            await asyncio.sleep(delay)
+
+
 async def generate_response(
     messages: List[Dict[str, str]],
     model_name: str = "gpt-4o-mini",
@@ -101,26 +264,63 @@ async def generate_response(
             model_kwargs["max_tokens"] = max_tokens
 
         if response_model:
-            model_kwargs["response_format"] = response_model
+            model_kwargs["response_format"] = _response_format(response_model)
 
         # Use litellm router for the completion
-        response = await router.acompletion(
+        response = await acompletion_with_retries(
             model=model_name, messages=messages, **model_kwargs
         )
         response, cost = text_cost_parser(response)
-        datamodel = response_model(**json.loads(response))
+        datamodel = response_model.model_validate_json(response)
         return datamodel
 
     except Exception as e:
-        logging.error("Error generating response: {}".format(e))
+        logging.error("Error generating response: %s", e)
         raise
 
 
+def _supports_cache_control(model_name: str) -> bool:
+    """Whether the router alias points at a provider with explicit prompt-cache breakpoints."""
+    return "claude" in model_name or "anthropic" in model_name
+
+
+def _build_mdc_messages(
+    system_prompt: str,
+    user_prompt: str,
+    cached_prefix: Optional[str],
+    model_name: str,
+) -> List[Dict[str, Any]]:
+    """
+    Build the chat messages, placing a shared prefix first in the user turn.
+
+    Anthropic models get the prefix as a separate content block marked with
+    cache_control. Other providers (OpenAI, Gemini) cache identical leading
+    tokens automatically, so there the prefix is simply prepended.
+    """
+    if cached_prefix and _supports_cache_control(model_name):
+        user_content: Any = [
+            {
+                "type": "text",
+                "text": cached_prefix,
+                "cache_control": {"type": "ephemeral"},
+            },
+            {"type": "text", "text": user_prompt},
+        ]
+    else:
+        user_content = (cached_prefix or "") + user_prompt
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content},
+    ]
+
+
 async def generate_mdc_response(
     system_prompt: str,
     user_prompt: str,
     model_name: str = "gpt-4o-mini",
     temperature: float = 0.0,
+    cached_prefix: Optional[str] = None,
+    response_cache: Optional[ResponseCache] = None,
 ) -> MDCResponse:
     """
     Generate an MDC response using the litellm Router.
@@ -130,29 +330,42 @@ async def generate_mdc_response(
         user_prompt: User prompt for the model
         model_name: Model name for router (may be overridden based on token count)
         temperature: Temperature for generation
+        cached_prefix: Optional text that precedes user_prompt and is identical
+            across many calls; sent so that providers can cache it
+        response_cache: Optional ResponseCache to answer repeated prompts from
 
     Returns:
         MDCResponse object with structured output
     """
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_prompt},
-    ]
+    if cached_prefix:
+        user_prompt_text = cached_prefix + user_prompt
+    else:
+        user_prompt_text = user_prompt
+
+    if response_cache is not None:
+        key = response_cache.key(model_name, temperature, system_prompt, user_prompt_text)
+        response = response_cache.get(key)
+        if response is None:
+            response = await generate_mdc_response(
+                system_prompt, user_prompt, model_name, temperature, cached_prefix
+            )
+            response_cache.put_many([(key, response)])
+        return response
 
     # Calculate token count for context window management
     tokenizer = get_tokenizer("gpt-4o")
     messages_tokens = 0
-    for message in messages:
-        messages_tokens += len(tokenize(message["content"], tokenizer))
+    for text in (system_prompt, user_prompt_text):
+        messages_tokens += len(tokenize(text, tokenizer))
     # Only log token count at DEBUG level or if very large
     if messages_tokens > 200000:
-        logging.info(f"Processing large content: {messages_tokens:,} tokens")
+        logging.info("Processing large content: %d tokens", messages_tokens)
     else:
-        logging.debug(f"Token count: {messages_tokens:,} tokens")
+        logging.debug("Token count: %d tokens", messages_tokens)
 
     # For extremely large content, still use the chunking approach
     if messages_tokens > 1000000:  # >1M tokens
-        return await process_large_content(system_prompt, user_prompt, temperature)
+        return await process_large_content(system_prompt, user_prompt_text, temperature)
 
     # For content within Gemini's context window but large, start with Gemini directly
     elif messages_tokens > 200000:  # 200K-1M tokens
@@ -164,6 +377,8 @@ async def generate_mdc_response(
     else:  # <128K tokens
         selected_model = model_name
 
+    messages = _build_mdc_messages(system_prompt, user_prompt, cached_prefix, selected_model)
+
     # Use selected model with LiteLLM's automatic fallbacks
     try:
         return await generate_response(
@@ -173,11 +388,11 @@ async def generate_mdc_response(
             temperature=temperature,
         )
     except Exception as e:
-        logging.error(f"Error with model {selected_model}: {e}")
+        logging.error("Error with model %s: %s", selected_model, e)
         # If we're already using Gemini and still failing, resort to chunking
         if selected_model == "gemini-2.0-flash":
             logging.info("Falling back to chunking approach for very large content")
-            return await process_large_content(system_prompt, user_prompt, temperature)
+            return await process_large_content(system_prompt, user_prompt_text, temperature)
         # Otherwise, let the exception propagate (LiteLLM will handle fallbacks)
         raise
 
@@ -219,7 +434,7 @@ async def process_large_content(
 
         start_idx = end_idx
 
-    logging.info(f"Split large content into {len(chunks)} chunks for processing")
+    logging.info("Split large content into %d chunks for processing", len(chunks))
 
     # Process each chunk with the appropriate model (using Gemini for large chunks)
     chunk_tasks = [
@@ -276,27 +491,78 @@ async def process_large_content(
     return final_result
 
 
+async def bounded(semaphore: Optional[asyncio.Semaphore], coro: Any) -> Any:
+    """Await coro, holding semaphore (if given) while it runs."""
+    if semaphore is None:
+        return await coro
+    async with semaphore:
+        return await coro
+
+
 async def batch_generate_mdc_responses(
     prompts: list[Dict[str, str]],
     model_name: Optional[str] = "gpt-4o-mini",
     model_names: Optional[list[str]] = None,
     temperature: float = 0.0,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    use_batch_api: bool = False,
+    response_cache: Optional[ResponseCache] = None,
 ) -> list[MDCResponse]:
     """
     Process a batch of MDC generation requests using the litellm Router.
     Lets LiteLLM router handle batching and rate limiting automatically.
 
+    With use_batch_api, prompts whose models are all OpenAI deployments are
+    submitted as one OpenAI Batch API job instead (about half the cost, but
+    results can take up to 24h); any other batch uses live requests.
+
     Args:
         prompts: List of dicts with 'system_prompt' and 'user_prompt'
         model_name: Optional model name for router (used if model_names is None)
         model_names: Optional list of model names, one per prompt (overrides model_name)
         temperature: Temperature for generation
+        semaphore: Optional semaphore bounding the requests in flight; pass
+            the same one to concurrent batches to share a single limit
+        use_batch_api: Submit the prompts through the OpenAI Batch API
+        response_cache: Optional ResponseCache; only prompts missing from it
+            are sent, and new responses are added to it
 
     Returns:
         List of MDCResponse objects
     """
-    # Reset cost tracker at the beginning of batch
-    initial_cost = get_total_cost()
+    if response_cache is not None:
+        per_prompt_models = model_names if model_names and len(model_names) == len(prompts) else None
+        keys = [
+            response_cache.key(
+                per_prompt_models[i] if per_prompt_models else model_name,
+                temperature,
+                p.get("system_prompt", "You are an expert code documentation specialist."),
+                p["user_prompt"],
+            )
+            for i, p in enumerate(prompts)
+        ]
+        results = [response_cache.get(key) for key in keys]
+        missing = [i for i, r in enumerate(results) if r is None]
+        logging.info("Response cache: %d of %d prompts cached", len(prompts) - len(missing), len(prompts))
+        if missing:
+            fresh = await batch_generate_mdc_responses(
+                prompts=[prompts[i] for i in missing],
+                model_name=model_name,
+                model_names=[per_prompt_models[i] for i in missing] if per_prompt_models else None,
+                temperature=temperature,
+                semaphore=semaphore,
+                use_batch_api=use_batch_api,
+            )
+            for i, response in zip(missing, fresh):
+                results[i] = response
+            response_cache.put_many(
+                [(keys[i], response) for i, response in zip(missing, fresh) if response is not None]
+            )
+        return results
+
+    # Sum this batch's own costs; the global tracker also counts any batch
+    # running concurrently with this one
+    batch_cost = 0.0
 
     # Prepare all messages and count tokens
     all_messages = []
@@ -320,8 +586,17 @@ async def batch_generate_mdc_responses(
         for message in messages:
             total_tokens += len(tokenize(message["content"], tokenizer))
 
+    if use_batch_api:
+        models = model_names if model_names and len(model_names) == len(prompts) else [model_name] * len(prompts)
+        deployments = [_openai_deployment(m) for m in models]
+        if all(deployments):
+            results, batch_cost = await _run_openai_batch(all_messages, deployments, temperature)
+            _log_batch_summary(len(prompts), batch_cost, total_tokens)
+            return results
+        logging.info("Batch API needs an OpenAI model for every prompt; using live requests")
+
     # Common model parameters
-    model_kwargs = {"temperature": temperature, "response_format": MDCResponse}
+    model_kwargs = {"temperature": temperature, "response_format": _response_format(MDCResponse)}
 
     try:
         # If model_names is provided, use a different model for each prompt
@@ -329,9 +604,9 @@ async def batch_generate_mdc_responses(
             # Make all API calls concurrently with different models
             responses = await asyncio.gather(
                 *(
-                    router.acompletion(
+                    bounded(semaphore, acompletion_with_retries(
                         model=model_names[i], messages=messages, **model_kwargs
-                    )
+                    ))
                     for i, messages in enumerate(all_messages)
                 ),
                 return_exceptions=True,
@@ -340,9 +615,9 @@ async def batch_generate_mdc_responses(
             # Use the same model for all prompts
             responses = await asyncio.gather(
                 *(
-                    router.acompletion(
+                    bounded(semaphore, acompletion_with_retries(
                         model=model_name, messages=messages, **model_kwargs
-                    )
+                    ))
                     for messages in all_messages
                 ),
                 return_exceptions=True,
@@ -354,39 +629,162 @@ async def batch_generate_mdc_responses(
             if isinstance(response, Exception):
                 model_used = model_names[i] if model_names else model_name
                 logging.error(
-                    f"Error processing prompt {i} with model {model_used}: {response}"
+                    "Error processing prompt %d with model %s: %s", i, model_used, response
                 )
                 results.append(None)
             else:
                 try:
                     content, cost = text_cost_parser(response)
-                    datamodel = MDCResponse(**json.loads(content))
+                    batch_cost += cost
+                    datamodel = MDCResponse.model_validate_json(content)
                     results.append(datamodel)
                 except Exception as e:
-                    logging.error(f"Error parsing response {i}: {e}")
+                    logging.error("Error parsing response %d: %s", i, e)
                     results.append(None)
 
-        # Log and print batch cost summary
-        batch_cost = get_total_cost() - initial_cost
-        
-        # Log to logger
-        logging.info(f"===== BATCH COST SUMMARY =====")
-        logging.info(
-            f"Processed {len(prompts)} prompts for a total cost of ${batch_cost:.6f}"
-        )
-        logging.info(f"Average cost per prompt: ${batch_cost/len(prompts):.6f}")
-        logging.info(f"Messages tokens: {total_tokens}")
-        logging.info("Batch processing complete.")
-        
-        # Also print to stdout to ensure visibility
-        print("\n===== BATCH COST SUMMARY =====")
-        print(f"Processed {len(prompts)} prompts for a total cost of ${batch_cost:.6f}")
-        print(f"Average cost per prompt: ${batch_cost/len(prompts):.6f}")
-        print(f"Messages tokens: {total_tokens}")
-        print("Batch processing complete.\n")
-
+        _log_batch_summary(len(prompts), batch_cost, total_tokens)
         return results
 
     except Exception as e:
-        logging.error(f"Batch processing failed: {e}")
+        logging.error("Batch processing failed: %s", e)
         raise
+
+
+def _log_batch_summary(prompt_count: int, batch_cost: float, total_tokens: int) -> None:
+    """Log and print the cost summary of one batch."""
+    # Log to logger
+    logging.info("===== BATCH COST SUMMARY =====")
+    logging.info(
+        "Processed %d prompts for a total cost of $%.6f", prompt_count, batch_cost
+    )
+    logging.info("Average cost per prompt: $%.6f", batch_cost / prompt_count)
+    logging.info("Messages tokens: %d", total_tokens)
+    logging.info("Batch processing complete.")
+
+    # Also print to stdout to ensure visibility
+    print("\n===== BATCH COST SUMMARY =====")
+    print(f"Processed {prompt_count} prompts for a total cost of ${batch_cost:.6f}")
+    print(f"Average cost per prompt: ${batch_cost/prompt_count:.6f}")
+    print(f"Messages tokens: {total_tokens}")
+    print("Batch processing complete.\n")
+
+
+# OpenAI Batch API settings
+_BATCH_ENDPOINT = "/v1/chat/completions"
+_BATCH_POLL_INITIAL = 5.0
+_BATCH_POLL_MAX = 60.0
+_BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+# Batch API requests are billed at half the live price
+_BATCH_DISCOUNT = 0.5
+
+
+def _openai_deployment(model_name: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Return the litellm_params of a router alias if it is an OpenAI model, else None."""
+    for deployment in chat_model_list:
+        if deployment["model_name"] == model_name:
+            params = deployment["litellm_params"]
+            if params["model"].startswith("openai/"):
+                return params
+            return None
+    return None
+
+
+async def _run_openai_batch(
+    all_messages: List[List[Dict[str, Any]]],
+    deployments: List[Dict[str, Any]],
+    temperature: float,
+) -> tuple[list[Optional[MDCResponse]], float]:
+    """
+    Run prompts as one OpenAI Batch API job and wait for the results.
+
+    Args:
+        all_messages: Chat messages, one list per prompt
+        deployments: litellm_params of the OpenAI deployment for each prompt
+        temperature: Temperature for generation
+
+    Returns:
+        Tuple of (results in prompt order, None for failed prompts; batch cost)
+    """
+    response_format = _response_format(MDCResponse)
+    api_key = deployments[0].get("api_key")
+
+    # One request per line; custom_id maps results back to prompt order
+    lines = []
+    for i, (messages, params) in enumerate(zip(all_messages, deployments)):
+        lines.append(json.dumps({
+            "custom_id": str(i),
+            "method": "POST",
+            "url": _BATCH_ENDPOINT,
+            "body": {
+                "model": params["model"].split("/", 1)[1],
+                "messages": messages,
+                "temperature": temperature,
+                "response_format": response_format,
+            },
+        }))
+    payload = ("\n".join(lines) + "\n").encode("utf-8")
+
+    input_file = await litellm.acreate_file(
+        file=("mdc_batch.jsonl", payload),
+        purpose="batch",
+        custom_llm_provider="openai",
+        api_key=api_key,
+    )
+    batch = await litellm.acreate_batch(
+        completion_window="24h",
+        endpoint=_BATCH_ENDPOINT,
+        input_file_id=input_file.id,
+        custom_llm_provider="openai",
+        api_key=api_key,
+    )
+    logging.info("Submitted OpenAI batch %s with %d requests", batch.id, len(lines))
+
+    # Poll with exponential backoff until the job finishes
+    delay = _BATCH_POLL_INITIAL
+    while batch.status not in _BATCH_TERMINAL_STATUSES:
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, _BATCH_POLL_MAX)
+        batch = await litellm.aretrieve_batch(
+            batch_id=batch.id,
+            custom_llm_provider="openai",
+            api_key=api_key,
+        )
+        logging.debug("Batch %s status: %s", batch.id, batch.status)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        raise Exception(f"OpenAI batch {batch.id} ended with status {batch.status}")
+
+    output = await litellm.afile_content(
+        file_id=batch.output_file_id,
+        custom_llm_provider="openai",
+        api_key=api_key,
+    )
+
+    results: list[Optional[MDCResponse]] = [None] * len(all_messages)
+    batch_cost = 0.0
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        i = int(record["custom_id"])
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            logging.error("Error processing prompt %d in batch %s: %s", i, batch.id, record.get("error") or response)
+            continue
+        try:
+            body = response["body"]
+            usage = body.get("usage") or {}
+            prompt_cost, completion_cost_usd = litellm.cost_per_token(
+                model=deployments[i]["model"],
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0),
+            )
+            cost = (prompt_cost + completion_cost_usd) * _BATCH_DISCOUNT
+            add_to_total_cost(cost)
+            batch_cost += cost
+            content = body["choices"][0]["message"]["content"]
+            results[i] = MDCResponse.model_validate_json(content)
+        except Exception as e:
+            logging.error("Error parsing response %d: %s", i, e)
+
+    return results, batch_cost
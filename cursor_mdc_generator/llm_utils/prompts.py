@@ -1,39 +1,14 @@
 import os
 
-
-def format_file_prompt(file_path, file_snippets, imports, imported_by):
-    """Generate the prompt for file-level MDC documentation."""
-    prompt = """
+# Static instruction text around the per-call parts of the MDC prompts
+_FILE_PROMPT_HEAD = """
 You are creating contextual documentation for a file in a codebase: {file_path}
 
 Here is the content of the file broken down into components:
 
-""".format(file_path=file_path)
-
-    for snippet in file_snippets:
-        prompt += "\n## {name} ({type})\n".format(
-            name=snippet["name"], type=snippet["type"]
-        )
-        prompt += "```python\n{content}\n```\n".format(content=snippet["content"])
-
-    # Add dependency information
-    prompt += "\n## Dependency Information\n"
-
-    if imports:
-        prompt += "\nThis file imports the following files:\n"
-        for imp in imports:
-            prompt += "- {}\n".format(imp)
-    else:
-        prompt += "\nThis file does not import any other files in the repository.\n"
-
-    if imported_by:
-        prompt += "\nThis file is imported by the following files:\n"
-        for imp_by in imported_by:
-            prompt += "- {}\n".format(imp_by)
-    else:
-        prompt += "\nThis file is not imported by any other files in the repository.\n"
+"""
 
-    prompt += """
+_FILE_PROMPT_TAIL = """
 Based on the file content and dependency information, create a .mdc file for Cursor IDE with:
 
 1. A concise description field explaining what this file does
@@ -47,42 +22,15 @@ Based on the file content and dependency information, create a .mdc file for Cur
    - Best practices when working with this code
 
 The output should help developers quickly understand this file and its role in the larger codebase.
-""".format(file_path=file_path)
-
-    return prompt
-
+"""
 
-def format_directory_prompt(directory, dir_files, dir_imports, imported_by_dir):
-    """Generate the prompt for directory-level MDC documentation."""
-    prompt = """
+_DIRECTORY_PROMPT_HEAD = """
 You are creating contextual documentation for a directory in a codebase: {directory}
 
 This directory contains the following files:
-""".format(directory=directory)
-
-    for file_path in dir_files:
-        prompt += "- {}\n".format(os.path.basename(file_path))
-
-    # Add dependency information
-    prompt += "\n## External Dependencies\n"
-
-    if dir_imports:
-        prompt += "\nFiles in this directory import from these external locations:\n"
-        for imp in dir_imports:
-            prompt += "- {}\n".format(imp)
-    else:
-        prompt += "\nThis directory doesn't import from any external files.\n"
-
-    if imported_by_dir:
-        prompt += (
-            "\nFiles in this directory are imported by these external locations:\n"
-        )
-        for imp_by in imported_by_dir:
-            prompt += "- {}\n".format(imp_by)
-    else:
-        prompt += "\nNo external files import from this directory.\n"
+"""
 
-    prompt += """
+_DIRECTORY_PROMPT_TAIL = """
 Based on the directory content and dependency information, create a .mdc file for Cursor IDE with:
 
 1. A concise description field explaining what this directory contains
@@ -96,44 +44,15 @@ Based on the directory content and dependency information, create a .mdc file fo
    - Best practices when working with files in this directory
 
 The output should help developers quickly understand the purpose and organization of this directory.
-""".format(directory=directory)
-
-    return prompt
-
+"""
 
-def format_repository_prompt(directories, core_modules, entry_points, cycles=None):
-    """Generate the prompt for repository-level MDC documentation."""
-    prompt = """
+_REPOSITORY_PROMPT_HEAD = """
 You are creating high-level documentation for an entire repository.
 
 The repository contains the following directories:
 """
-    for directory in sorted(directories):
-        prompt += "- {}\n".format(directory)
-
-    # Add dependency information
-    prompt += "\n## Core Modules\n"
-
-    if core_modules:
-        prompt += "\nThese files are imported by multiple other files and represent core functionality:\n"
-        for module, in_degree in core_modules[:10]:  # Show top 10
-            prompt += "- {} (imported by {} files)\n".format(module, in_degree)
-
-    if entry_points:
-        prompt += "\n## Entry Points\n"
-        prompt += (
-            "\nThese files import other modules but are not imported themselves:\n"
-        )
-        for entry in entry_points:
-            prompt += "- {}\n".format(entry)
 
-    if cycles:
-        prompt += "\n## Circular Dependencies\n"
-        prompt += "\nThe following circular dependencies were detected:\n"
-        for i, cycle in enumerate(cycles[:5]):  # Show at most 5 cycles
-            prompt += "{}. Cycle: {} → {}\n".format(i + 1, " → ".join(cycle), cycle[0])
-
-    prompt += """
+_REPOSITORY_PROMPT_TAIL = """
 Based on the repository structure and dependency information, create a .mdc file for Cursor IDE with:
 
 1. A concise description field explaining what this repository does
@@ -150,7 +69,100 @@ Based on the repository structure and dependency information, create a .mdc file
 The output should help developers quickly understand the overall structure and organization of the codebase.
 """
 
-    return prompt
+
+def format_file_prompt(file_path, file_snippets, imports, imported_by):
+    """Generate the prompt for file-level MDC documentation."""
+    # Collect the pieces and join once; repeated str += is quadratic in prompt size
+    parts = [_FILE_PROMPT_HEAD.format(file_path=file_path)]
+
+    parts.extend(
+        "\n## {name} ({type})\n```python\n{content}\n```\n".format(
+            name=snippet["name"], type=snippet["type"], content=snippet["content"]
+        )
+        for snippet in file_snippets
+    )
+
+    # Add dependency information
+    parts.append("\n## Dependency Information\n")
+
+    if imports:
+        parts.append("\nThis file imports the following files:\n")
+        parts.extend("- {}\n".format(imp) for imp in imports)
+    else:
+        parts.append("\nThis file does not import any other files in the repository.\n")
+
+    if imported_by:
+        parts.append("\nThis file is imported by the following files:\n")
+        parts.extend("- {}\n".format(imp_by) for imp_by in imported_by)
+    else:
+        parts.append("\nThis file is not imported by any other files in the repository.\n")
+
+    parts.append(_FILE_PROMPT_TAIL.format(file_path=file_path))
+
+    return "".join(parts)
+
+
+def format_directory_prompt(directory, dir_files, dir_imports, imported_by_dir):
+    """Generate the prompt for directory-level MDC documentation."""
+    parts = [_DIRECTORY_PROMPT_HEAD.format(directory=directory)]
+
+    parts.extend("- {}\n".format(os.path.basename(file_path)) for file_path in dir_files)
+
+    # Add dependency information
+    parts.append("\n## External Dependencies\n")
+
+    if dir_imports:
+        parts.append("\nFiles in this directory import from these external locations:\n")
+        parts.extend("- {}\n".format(imp) for imp in dir_imports)
+    else:
+        parts.append("\nThis directory doesn't import from any external files.\n")
+
+    if imported_by_dir:
+        parts.append(
+            "\nFiles in this directory are imported by these external locations:\n"
+        )
+        parts.extend("- {}\n".format(imp_by) for imp_by in imported_by_dir)
+    else:
+        parts.append("\nNo external files import from this directory.\n")
+
+    parts.append(_DIRECTORY_PROMPT_TAIL.format(directory=directory))
+
+    return "".join(parts)
+
+
+def format_repository_prompt(directories, core_modules, entry_points, cycles=None):
+    """Generate the prompt for repository-level MDC documentation."""
+    parts = [_REPOSITORY_PROMPT_HEAD]
+    parts.extend("- {}\n".format(directory) for directory in sorted(directories))
+
+    # Add dependency information
+    parts.append("\n## Core Modules\n")
+
+    if core_modules:
+        parts.append("\nThese files are imported by multiple other files and represent core functionality:\n")
+        parts.extend(
+            "- {} (imported by {} files)\n".format(module, in_degree)
+            for module, in_degree in core_modules[:10]  # Show top 10
+        )
+
+    if entry_points:
+        parts.append("\n## Entry Points\n")
+        parts.append(
+            "\nThese files import other modules but are not imported themselves:\n"
+        )
+        parts.extend("- {}\n".format(entry) for entry in entry_points)
+
+    if cycles:
+        parts.append("\n## Circular Dependencies\n")
+        parts.append("\nThe following circular dependencies were detected:\n")
+        parts.extend(
+            "{}. Cycle: {} → {}\n".format(i + 1, " → ".join(cycle), cycle[0])
+            for i, cycle in enumerate(cycles[:5])  # Show at most 5 cycles
+        )
+
+    parts.append(_REPOSITORY_PROMPT_TAIL)
+
+    return "".join(parts)
 
 
 def format_consolidation_prompt(valid_results, mdc_outputs):
@@ -171,40 +183,30 @@ def format_consolidation_prompt(valid_results, mdc_outputs):
 SYSTEM_PROMPT = "You are an expert code documentation specialist."
 
 
-def format_thematic_rule_prompt(
-    rule_spec: dict,
-    project_context: str,
-    authoring_spec: str,
-) -> str:
+def format_thematic_rule_prefix(project_context: str, authoring_spec: str) -> str:
     """
-    Generate the prompt for thematic rule generation.
+    Generate the static part of the thematic rule prompt.
+
+    The prefix is identical for every rule generated in a run and comes first,
+    so providers can serve it from their prompt cache.
 
     Args:
-        rule_spec: Rule specification with category, slug, description, tags, globs
         project_context: Summary of detected project properties
         authoring_spec: Content of rule_authoring_spec.md
 
     Returns:
-        Formatted prompt for LLM
+        Prompt prefix shared by all rules of the run
     """
     prompt = f"""You are generating a high-quality Cursor MDC rule following strict authoring standards.
 
 ## Project Context
 {project_context}
 
-## Rule Specification to Generate
-- **Category**: {rule_spec.get('category', 'unknown')}
-- **Slug**: {rule_spec.get('slug', 'unknown')}
-- **Description**: {rule_spec.get('description', 'No description provided')}
-- **Tags**: {', '.join(rule_spec.get('tags', []))}
-- **Glob Patterns**: {', '.join(rule_spec.get('globs', [])) if rule_spec.get('globs') else 'None (agent/manual activation)'}
-- **Activation Type**: {rule_spec.get('activation', 'auto')}
-
 ## Authoring Standards
 {authoring_spec}
 
 ## Your Task
-Create a complete MDC rule file that:
+Create a complete MDC rule file for the rule specification given at the end that:
 
 1. **Follows the frontmatter structure exactly** as specified in the authoring standards
 2. **Includes specific, actionable requirements** relevant to the project context
@@ -215,7 +217,7 @@ Create a complete MDC rule file that:
    - agent: alwaysApply=false, empty globs, comprehensive description
    - manual: alwaysApply=false, empty globs, minimal description
 5. **Maintains focus** on a single concern (30-100 lines typical)
-6. **Avoids generic advice** - be specific to {rule_spec.get('slug', 'this topic')}
+6. **Avoids generic advice** - be specific to the rule's slug
 
 The rule should be immediately useful to developers working with {project_context.split(':')[0] if ':' in project_context else 'this project'}.
 
@@ -224,6 +226,47 @@ Generate the complete MDC file content including YAML frontmatter and markdown b
     return prompt
 
 
+def format_thematic_rule_spec(rule_spec: dict) -> str:
+    """
+    Generate the per-rule part of the thematic rule prompt.
+
+    Args:
+        rule_spec: Rule specification with category, slug, description, tags, globs
+
+    Returns:
+        Prompt suffix describing the rule to generate
+    """
+    prompt = f"""
+## Rule Specification to Generate
+- **Category**: {rule_spec.get('category', 'unknown')}
+- **Slug**: {rule_spec.get('slug', 'unknown')}
+- **Description**: {rule_spec.get('description', 'No description provided')}
+- **Tags**: {', '.join(rule_spec.get('tags', []))}
+- **Glob Patterns**: {', '.join(rule_spec.get('globs', [])) if rule_spec.get('globs') else 'None (agent/manual activation)'}
+- **Activation Type**: {rule_spec.get('activation', 'auto')}
+"""
+    return prompt
+
+
+def format_thematic_rule_prompt(
+    rule_spec: dict,
+    project_context: str,
+    authoring_spec: str,
+) -> str:
+    """
+    Generate the prompt for thematic rule generation.
+
+    Args:
+        rule_spec: Rule specification with category, slug, description, tags, globs
+        project_context: Summary of detected project properties
+        authoring_spec: Content of rule_authoring_spec.md
+
+    Returns:
+        Formatted prompt for LLM
+    """
+    return format_thematic_rule_prefix(project_context, authoring_spec) + format_thematic_rule_spec(rule_spec)
+
+
 def format_project_summary_prompt(project_context: str) -> str:
     """
     Generate a prompt for creating a project summary rule.
@@ -1,6 +1,9 @@
+import functools
+
 import tiktoken
 
 
+@functools.lru_cache(maxsize=None)
 def get_tokenizer(model):
     return tiktoken.encoding_for_model(model)
 
@@ -4,8 +4,9 @@ Module for analyzing quality of existing MDC files.
 
 import os
 import re
+import json
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
 from datetime import datetime
 from .llm_utils.models import MDCResponse
 from .logging_utils import log_section, log_file_status, log_summary
@@ -91,8 +92,16 @@ def parse_mdc_file(file_path: str) -> Optional[Dict]:
         globs_match = re.search(r'^globs:\s*(\[.*?\])$', frontmatter_raw, re.MULTILINE)
         always_apply_match = re.search(r'^alwaysApply:\s*(.+)$', frontmatter_raw, re.MULTILINE)
         
+        description = description_match.group(1).strip() if description_match else ''
+        if description.startswith('"'):
+            # Written JSON-quoted by write_mdc_file
+            try:
+                description = json.loads(description)
+            except ValueError:
+                pass
+        
         return {
-            'description': description_match.group(1).strip() if description_match else '',
+            'description': description,
             'globs': globs_match.group(1) if globs_match else '[]',
             'always_apply': always_apply_match.group(1).strip() if always_apply_match else 'false',
             'content': markdown_content,
@@ -265,13 +274,13 @@ def analyze_mdc_quality(file_path: str) -> Tuple[float, List[str], bool]:
     return overall_score, all_issues, is_high_quality
 
 
-def scan_existing_mdc_files(rules_dir: str, expected_files: List[str]) -> MDCQualityReport:
+def scan_existing_mdc_files(rules_dir: str, expected_files: Iterable[str]) -> MDCQualityReport:
     """
     Scan existing MDC files and assess their quality.
     
     Args:
         rules_dir: Path to .cursor/rules directory
-        expected_files: List of files that should have MDC documentation
+        expected_files: Files that should have MDC documentation (iterated up to twice)
         
     Returns:
         MDCQualityReport with analysis results
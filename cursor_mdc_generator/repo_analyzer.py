@@ -1,4 +1,5 @@
 import os
+import heapq
 import json
 import argparse
 import asyncio
@@ -11,7 +12,9 @@ import logging
 
 from .repository_structure import get_repo_files, generate_directory_structure
 from .symbolic_graph import analyze_imports_and_usage, convert_to_relative_paths
-from .code_summarization import read_file_content, split_content, generate_mdc_files
+from .code_splitting import SplitCache, split_files
+from .code_summarization import read_file_content, generate_mdc_files, find_cycles
+from .llm_utils.llm_client import ResponseCache
 from .visualize_dependency_graph import visualize_dependency_graph, HAS_PYGRAPHVIZ
 
 
@@ -65,66 +68,57 @@ def generate_report(
         # Find most imported files (most depended-upon files)
         if G.nodes():
             # Calculate in-degree (number of files importing this file)
-            in_degree = sorted(
-                [(n, G.in_degree(n)) for n in G.nodes()],
-                key=lambda x: x[1],
-                reverse=True,
-            )
+            in_degree = heapq.nlargest(10, G.in_degree(), key=lambda x: x[1])
             f.write("#### Most Imported Files\n\n")
-            for node, degree in in_degree[:10]:  # Show top 10
+            for node, degree in in_degree:  # Show top 10
                 if degree > 0:
                     f.write("- **%s**: Imported by %d files\n" % (node, degree))
             f.write("\n")
 
             # Calculate out-degree (number of imports from this file)
-            out_degree = sorted(
-                [(n, G.out_degree(n)) for n in G.nodes()],
-                key=lambda x: x[1],
-                reverse=True,
-            )
+            out_degree = heapq.nlargest(10, G.out_degree(), key=lambda x: x[1])
             f.write("#### Files With Most Dependencies\n\n")
-            for node, degree in out_degree[:10]:  # Show top 10
+            for node, degree in out_degree:  # Show top 10
                 if degree > 0:
                     f.write("- **%s**: Imports %d files\n" % (node, degree))
             f.write("\n")
 
             # Identify potential core modules (high in-degree)
             core_threshold = 3  # Files imported by at least 3 other files
-            core_modules = [n for n, d in in_degree if d >= core_threshold]
+            core_modules = sorted(
+                ((n, d) for n, d in G.in_degree() if d >= core_threshold),
+                key=lambda x: x[1],
+                reverse=True,
+            )
             if core_modules:
                 f.write("#### Potential Core Modules\n\n")
                 f.write(
                     "These files are imported by multiple other files and may represent core functionality:\n\n"
                 )
-                for module in core_modules:
-                    f.write(
-                        "- **%s**: Imported by %d files\n"
-                        % (module, G.in_degree(module))
-                    )
+                for module, degree in core_modules:
+                    f.write("- **%s**: Imported by %d files\n" % (module, degree))
             f.write("\n")
 
             # Try to identify entry points (files with imports but not imported by others)
-            entry_points = [
-                n for n in G.nodes() if G.out_degree(n) > 0 and G.in_degree(n) == 0
-            ]
+            entry_points = [n for n, preds in G.pred.items() if not preds and G.succ[n]]
             if entry_points:
                 f.write("#### Potential Entry Points\n\n")
                 f.write(
                     "These files import other modules but are not imported themselves, suggesting they may be entry points:\n\n"
                 )
                 for entry in entry_points:
-                    f.write(
-                        "- **%s**: Imports %d files\n" % (entry, G.out_degree(entry))
-                    )
+                    f.write("- **%s**: Imports %d files\n" % (entry, len(G.succ[entry])))
             f.write("\n")
 
             # Identify circular dependencies (potential code smell)
             try:
-                cycles = list(nx.simple_cycles(G))
+                # One cycle per group of mutually dependent files; listing
+                # every simple cycle is exponential on tangled graphs
+                cycles = find_cycles(G, limit=None)
                 if cycles:
                     f.write("#### Circular Dependencies ⚠️\n\n")
                     f.write(
-                        "The following circular dependencies were detected (these may cause issues):\n\n"
+                        "The following circular dependencies were detected (these may cause issues), one per group of mutually dependent files:\n\n"
                     )
                     for i, cycle in enumerate(cycles[:10]):  # Show at most 10 cycles
                         cycle_str = " → ".join(cycle)
@@ -132,7 +126,7 @@ def generate_report(
 
                     if len(cycles) > 10:
                         f.write(
-                            "\n...and %d more circular dependencies.\n"
+                            "\n...and %d more groups with circular dependencies.\n"
                             % (len(cycles) - 10)
                         )
                     f.write("\n")
@@ -281,6 +275,9 @@ async def analyze_repository(
     max_directory_depth=2,
     check_quality=False,
     update_poor_quality=False,
+    max_concurrency=20,
+    use_batch_api=False,
+    use_response_cache=True,
 ):
     """
     Analyze a repository and generate structure, graph, and summaries.
@@ -302,6 +299,9 @@ async def analyze_repository(
         max_directory_depth: Maximum directory depth for generating MDC files (0=repo only, 1=top-level dirs, etc.)
         check_quality: Whether to check quality of existing MDC files before generating
         update_poor_quality: Whether to only update files with poor quality
+        max_concurrency: Maximum number of concurrent LLM requests
+        use_batch_api: Whether to generate file and directory MDCs through the OpenAI Batch API
+        use_response_cache: Whether to reuse LLM responses to identical prompts from earlier runs
     """
     # Set default local path if not provided
     if not local_path:
@@ -384,35 +384,46 @@ async def analyze_repository(
 
         # Step 6: Split files and prepare for MDC generation
         logging.info("Splitting files into functions and classes...")
-        file_data = {}
+        contents = {}
         for file_path in relevant_files:
-            full_path = os.path.join(local_path, file_path)
-            try:
-                content = read_file_content(full_path)
-                if content:
-                    file_data[file_path] = split_content(content, file_path)
-                else:
-                    logging.error("Error reading file: %s" % file_path)
-            except Exception as e:
-                logging.error("Error processing file: %s. Error: %s" % (file_path, e))
+            content = read_file_content(os.path.join(local_path, file_path))
+            if content:
+                contents[file_path] = content
+            else:
+                logging.error("Error reading file: %s" % file_path)
+        # Splits of unchanged files are reused from earlier runs
+        with SplitCache(os.path.join(output_dir, ".cache", "ast.sqlite")) as split_cache:
+            file_data = await split_files(contents, split_cache)
 
         # Step 7: Generate MDC files with dependency information
         logging.info("Generating MDC documentation files...")
         mdc_output_dir = os.path.join(local_path, ".cursor/rules")
         os.makedirs(mdc_output_dir, exist_ok=True)
-        mdc_files = await generate_mdc_files(
-            file_data,
-            G_rel,
-            mdc_output_dir,
-            model_name=model_name,
-            include_import_rules=include_import_rules,
-            skip_directory_mdcs=skip_directory_mdcs,
-            skip_repository_mdc=skip_repository_mdc,
-            max_directory_depth=max_directory_depth,
-            check_quality=check_quality,
-            update_poor_quality=update_poor_quality,
-            analysis_output_dir=output_dir,
+        response_cache = (
+            ResponseCache(os.path.join(output_dir, ".cache", "responses.sqlite"))
+            if use_response_cache
+            else None
         )
+        try:
+            mdc_files = await generate_mdc_files(
+                file_data,
+                G_rel,
+                mdc_output_dir,
+                model_name=model_name,
+                include_import_rules=include_import_rules,
+                skip_directory_mdcs=skip_directory_mdcs,
+                skip_repository_mdc=skip_repository_mdc,
+                max_directory_depth=max_directory_depth,
+                check_quality=check_quality,
+                update_poor_quality=update_poor_quality,
+                analysis_output_dir=output_dir,
+                max_concurrency=max_concurrency,
+                use_batch_api=use_batch_api,
+                response_cache=response_cache,
+            )
+        finally:
+            if response_cache is not None:
+                response_cache.close()
 
         # Log information about generated MDC files
         file_mdcs = sum(
@@ -116,18 +116,19 @@ class ProjectDetector:
 
     def _gather_config_content(self) -> str:
         """Gather content from configuration files."""
-        corpus = ""
+        # Config files such as lockfiles can be large; join once at the end
+        parts = []
         for filename in self.CONFIG_FILES:
             # Handle wildcards
             if "*" in filename:
                 pattern = str(self.repo_root / filename)
                 for path in glob.glob(pattern):
-                    corpus += "\n" + self._read_file(path)
+                    parts.append(self._read_file(path))
             else:
                 path = self.repo_root / filename
                 if path.exists():
-                    corpus += "\n" + self._read_file(str(path))
-        return corpus
+                    parts.append(self._read_file(str(path)))
+        return "".join("\n" + part for part in parts)
 
     def _detect_from_filesystem(self, detections: Dict[str, bool]) -> None:
         """Detect technologies based on file extensions and structure."""
@@ -364,8 +365,10 @@ def load_mapping_config(mapping_path: Optional[str] = None) -> Dict:
         try:
             # Try YAML first
             import yaml
+            # Prefer the libyaml-backed loader when PyYAML was built with it
+            loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
             with open(mapping_path, "r", encoding="utf-8") as f:
-                return yaml.safe_load(f) or {}
+                return yaml.load(f, Loader=loader) or {}
         except ImportError:
             # Fallback to JSON if PyYAML not available
             try:
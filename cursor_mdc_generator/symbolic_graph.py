@@ -243,7 +243,7 @@ def analyze_js_ts_with_regex(file_path, repo_path, G):
     # relative_path = os.path.relpath(file_path, repo_path)
 
     # Add node for this file if it doesn't exist
-    if file_path not in G.nodes():
+    if file_path not in G:
         G.add_node(file_path, type="file")
 
     # Regex patterns to match different types of imports with capturing groups for imported items
@@ -386,7 +386,7 @@ def analyze_js_ts_with_regex(file_path, repo_path, G):
                         target_full_path = os.path.abspath(
                             target_with_ext
                         )  # Get absolute path
-                        if target_full_path not in G.nodes():
+                        if target_full_path not in G:
                             G.add_node(target_full_path, type="file")
 
                         # Add edge with imported items
@@ -431,7 +431,7 @@ def analyze_js_ts_with_regex(file_path, repo_path, G):
             if os.path.exists(target_with_ext):
                 target = os.path.relpath(target_with_ext, repo_path)
                 target_full_path = os.path.abspath(target_with_ext)  # Get absolute path
-                if target_full_path not in G.nodes():
+                if target_full_path not in G:
                     G.add_node(target_full_path, type="file")
 
                 # Add edge with imported items
@@ -466,7 +466,7 @@ def analyze_js_ts_with_regex(file_path, repo_path, G):
             if os.path.exists(index_path):
                 target = os.path.relpath(index_path, repo_path)
                 target_full_path = os.path.abspath(index_path)  # Get absolute path
-                if target_full_path not in G.nodes():
+                if target_full_path not in G:
                     G.add_node(target_full_path, type="file")
 
                 # Add edge with imported items
@@ -554,7 +554,7 @@ def analyze_imports_and_usage(file_path, repo_path, G):
                 content = f.read()
 
         # Add node for this file if it doesn't exist
-        if file_path not in G.nodes():
+        if file_path not in G:
             G.add_node(file_path, type="file")
 
         # For Python files, use AST to analyze imports
@@ -573,7 +573,7 @@ def analyze_imports_and_usage(file_path, repo_path, G):
                             logging.debug(f"Import: {name} -> {resolved_path}")
                             if resolved_path:
                                 # Make sure the target node exists with type "file"
-                                if resolved_path not in G.nodes():
+                                if resolved_path not in G:
                                     G.add_node(resolved_path, type="file")
 
                                 # For regular imports, the imported name is the module itself
@@ -642,7 +642,7 @@ def analyze_imports_and_usage(file_path, repo_path, G):
                         # Resolve import path and add edge to graph with specific imported items
                         if import_path:
                             # Make sure the target node exists with type "file"
-                            if import_path not in G.nodes():
+                            if import_path not in G:
                                 G.add_node(import_path, type="file")
 
                             # Extract the specific names being imported
@@ -0,0 +1,70 @@
+"""Tests for file MDC prompt sizing in code_summarization."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("litellm")
+pytest.importorskip("tiktoken")
+
+import networkx as nx
+
+from cursor_mdc_generator import code_summarization as cs
+
+
+def _run_file_phase(monkeypatch, tmp_path, file_data):
+    """Run the file MDC phase and return the (prompt, model) pairs it sent."""
+    sent = []
+
+    async def fake_batch(prompts, model_names=None, **kwargs):
+        sent.extend(zip(prompts, model_names))
+        return [None] * len(prompts)
+
+    monkeypatch.setattr(cs, "batch_generate_mdc_responses", fake_batch)
+    graph_context = cs.GraphContext(nx.DiGraph(), file_data.keys())
+    asyncio.run(cs._generate_file_mdcs(
+        file_data, graph_context, str(tmp_path), "gpt-4o-mini",
+        include_import_rules=False, semaphore=None,
+        use_batch_api=False, response_cache=None,
+    ))
+    return sent
+
+
+def _whole_file(content):
+    return [{"name": "whole_file", "type": "file", "content": content}]
+
+
+def test_large_non_python_file_goes_to_large_context_model(tmp_path, monkeypatch):
+    content = "".join("row {} of the data set\n".format(i) for i in range(30000))
+    sent = _run_file_phase(monkeypatch, tmp_path, {"data/big.csv": _whole_file(content)})
+
+    [(prompt, model)] = sent
+    assert model != "gpt-4o-mini"
+    assert content in prompt["user_prompt"]
+    assert "[truncated" not in prompt["user_prompt"]
+
+
+def test_oversized_non_python_file_keeps_its_head(tmp_path, monkeypatch):
+    monkeypatch.setattr(cs, "LARGE_CONTEXT_TOKENS", 50000)
+    monkeypatch.setattr(cs, "FILE_PROMPT_TOKEN_BUDGET", 1000)
+    content = "".join("row {} of the data set\n".format(i) for i in range(30000))
+    sent = _run_file_phase(monkeypatch, tmp_path, {"data/big.csv": _whole_file(content)})
+
+    [(prompt, model)] = sent
+    assert model == "gpt-4o-mini"
+    user_prompt = prompt["user_prompt"]
+    assert "row 0 of the data set\nrow 1 of the data set\n" in user_prompt
+    assert "[truncated: " in user_prompt
+    assert "row 29999 of the data set" not in user_prompt
+
+
+def test_fit_snippets_truncates_to_budget(monkeypatch):
+    monkeypatch.setattr(cs, "FILE_PROMPT_TOKEN_BUDGET", 1000)
+    content = "".join("row {} of the data set\n".format(i) for i in range(30000))
+
+    [snippet] = cs._fit_snippets_to_budget("data/big.csv", _whole_file(content))
+
+    head, marker = snippet["content"].split("[truncated: ")
+    assert content.startswith(head)
+    assert head.endswith("\n")
+    assert cs._token_count(snippet["content"]) <= 1000